@@ -2,7 +2,6 @@
 
 # pylint: disable=no-value-for-parameter
 
-import asyncio
 from typing import Optional, Tuple
 
 import click
@@ -10,6 +9,12 @@ import click
 from gitingest.config import MAX_FILE_SIZE, OUTPUT_FILE_NAME
 from gitingest.entrypoint import ingest_async
 
+try:
+    # The libuv event loop, installed along with `uvicorn[standard]` on most platforms
+    from uvloop import run as run_event_loop
+except ImportError:
+    from asyncio import run as run_event_loop
+
 
 @click.command()
 @click.argument("source", type=str, default=".")
@@ -18,6 +23,8 @@ from gitingest.entrypoint import ingest_async
 @click.option("--exclude-pattern", "-e", multiple=True, help="Patterns to exclude")
 @click.option("--include-pattern", "-i", multiple=True, help="Patterns to include")
 @click.option("--branch", "-b", default=None, help="Branch to clone and ingest")
+@click.option("--jobs", "-j", default=1, type=int, help="Number of threads used to walk the directory tree")
+@click.option("--probe", is_flag=True, default=False, help="Check that the repository exists before cloning it")
 def main(
     source: str,
     output: Optional[str],
@@ -25,6 +32,8 @@ def main(
     exclude_pattern: Tuple[str, ...],
     include_pattern: Tuple[str, ...],
     branch: Optional[str],
+    jobs: int,
+    probe: bool,
 ):
     """
      Main entry point for the CLI. This function is called when the CLI is run as a script.
@@ -46,9 +55,13 @@ def main(
         A tuple of patterns to include during the analysis. Only files matching these patterns will be processed.
     branch : str, optional
         The branch to clone (optional).
+    jobs : int
+        The number of threads used to walk the directory tree, by default 1.
+    probe : bool
+        Whether to check that the repository exists before cloning it.
     """
     # Main entry point for the CLI. This function is called when the CLI is run as a script.
-    asyncio.run(_async_main(source, output, max_size, exclude_pattern, include_pattern, branch))
+    run_event_loop(_async_main(source, output, max_size, exclude_pattern, include_pattern, branch, jobs, probe))
 
 
 async def _async_main(
@@ -58,6 +71,8 @@ async def _async_main(
     exclude_pattern: Tuple[str, ...],
     include_pattern: Tuple[str, ...],
     branch: Optional[str],
+    jobs: int,
+    probe: bool,
 ) -> None:
     """
     Analyze a directory or repository and create a text dump of its contents.
@@ -80,6 +95,10 @@ async def _async_main(
         A tuple of patterns to include during the analysis. Only files matching these patterns will be processed.
     branch : str, optional
         The branch to clone (optional).
+    jobs : int
+        The number of threads used to walk the directory tree, by default 1.
+    probe : bool
+        Whether to check that the repository exists before cloning it.
 
     Raises
     ------
@@ -93,7 +112,16 @@ async def _async_main(
 
         if not output:
             output = OUTPUT_FILE_NAME
-        summary, _, _ = await ingest_async(source, max_size, include_patterns, exclude_patterns, branch, output=output)
+        summary, _, _ = await ingest_async(
+            source,
+            max_size,
+            include_patterns,
+            exclude_patterns,
+            branch,
+            output=output,
+            jobs=jobs,
+            probe=probe,
+        )
 
         click.echo(f"Analysis complete! Output written to: {output}")
         click.echo("\nSummary:")
@@ -1,18 +1,38 @@
 """This module contains functions for cloning a Git repository to a local path."""
 
+import asyncio
+import hashlib
 import os
+import shutil
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Sequence
 
+from gitingest.config import CLONE_CACHE_PATH, MAX_PARALLEL_CLONES
 from gitingest.schemas import CloneConfig
-from gitingest.utils.git_utils import check_repo_exists, ensure_git_installed, run_command
+from gitingest.utils.git_utils import (
+    GIT_CLONE_REVISION_VERSION,
+    check_repo_exists,
+    ensure_git_installed,
+    run_command,
+)
+from gitingest.utils.ingestion_utils import WILDCARD_CHARS
 from gitingest.utils.timeout_wrapper import async_timeout
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
 TIMEOUT: int = 60
+LOCK_POLL_INTERVAL: float = 0.1  # Seconds between two attempts to take the lock of a mirror
+
+# Lower-cased fragments of the `git clone` error output that mean the repository is missing or private
+_REPO_NOT_FOUND_MARKERS = ("repository not found", "could not read username", "authentication failed")
 
 
 @async_timeout(TIMEOUT)
-async def clone_repo(config: CloneConfig) -> None:
+async def clone_repo(config: CloneConfig, probe: bool = False) -> None:
     """
     Clone a repository to a local path based on the provided configuration.
 
@@ -20,10 +40,18 @@ async def clone_repo(config: CloneConfig) -> None:
     It can clone a specific branch or commit if provided, and it raises exceptions if
     any errors occur during the cloning process.
 
+    When only part of the repository is needed (a subpath, or include patterns that all lie under known
+    directories), a blobless sparse clone is made so that files outside of it are never downloaded.
+
+    If `CLONE_CACHE_PATH` is set, the repository is checked out from a local mirror instead, see `_clone_from_mirror`.
+
     Parameters
     ----------
     config : CloneConfig
         The configuration for cloning the repository.
+    probe : bool
+        Whether to check that the repository exists before cloning it, by default False. Without the check, a
+        missing repository is detected from the error output of `git clone`, which saves a round trip.
 
     Raises
     ------
@@ -37,7 +65,7 @@ async def clone_repo(config: CloneConfig) -> None:
     local_path: str = config.local_path
     commit: Optional[str] = config.commit
     branch: Optional[str] = config.branch
-    partial_clone: bool = config.subpath != "/"
+    sparse_paths: List[str] = _get_sparse_checkout_paths(config)
 
     # Create parent directory if it doesn't exist
     parent_dir = Path(local_path).parent
@@ -47,39 +75,204 @@ async def clone_repo(config: CloneConfig) -> None:
         raise OSError(f"Failed to create parent directory {parent_dir}: {exc}") from exc
 
     # Check if the repository exists
-    if not await check_repo_exists(url):
+    if probe and not await check_repo_exists(url):
         raise ValueError("Repository not found, make sure it is public")
 
+    git_version = await ensure_git_installed()
+    if CLONE_CACHE_PATH is not None:
+        await _clone_from_mirror(config, CLONE_CACHE_PATH)
+        return
+
+    # Recent Git versions clone a commit directly, older ones clone the history and check out the commit afterwards
+    checkout_commit = commit if commit and git_version < GIT_CLONE_REVISION_VERSION else None
+
     clone_cmd = ["git", "clone", "--single-branch"]
     # TODO re-enable --recurse-submodules
 
-    if partial_clone:
+    if sparse_paths:
         clone_cmd += ["--filter=blob:none", "--sparse"]
 
+    if checkout_commit:
+        # The commit is checked out right after, so the files of the default branch need not be written first
+        clone_cmd += ["--no-checkout"]
+
     if not commit:
         clone_cmd += ["--depth=1"]
         if branch and branch.lower() not in ("main", "master"):
             clone_cmd += ["--branch", branch]
+    elif not checkout_commit:
+        clone_cmd += [f"--revision={commit}", "--depth=1"]
 
     clone_cmd += [url, local_path]
 
     # Clone the repository
-    await ensure_git_installed()
-    await run_command(*clone_cmd)
+    await _run_remote_command(*clone_cmd)
+
+    # `sparse-checkout set` and `checkout` are separate Git commands, each needs its own process
+    if sparse_paths:
+        await run_command("git", "-C", local_path, "sparse-checkout", "set", *sparse_paths, capture=False)
+
+    if checkout_commit:
+        await run_command("git", "-C", local_path, "checkout", checkout_commit, capture=False)
+
+
+async def _clone_from_mirror(config: CloneConfig, cache_path: Path) -> None:
+    """
+    Check out a repository from its local bare mirror, creating or updating the mirror first.
+
+    The first clone of a URL makes a blobless bare clone of it under `cache_path`; later clones only fetch the branches
+    that changed into it. The requested commit or branch, or else the remote `HEAD`, is then added at
+    `config.local_path` as a detached worktree of the mirror, which downloads only the file contents missing from the
+    mirror. The whole tree is checked out, and a commit must be reachable from a branch of the remote. The mirror is
+    locked throughout, so a concurrent update never prunes it while the worktree is being added.
+
+    Parameters
+    ----------
+    config : CloneConfig
+        The configuration for cloning the repository.
+    cache_path : Path
+        The directory holding the mirrors.
+    """
+    mirror_path = cache_path / hashlib.sha1(config.url.encode()).hexdigest()
+    mirror = str(mirror_path)
+
+    async with _lock_file(mirror_path.with_name(mirror_path.name + ".lock")):
+        if mirror_path.is_dir():
+            await _run_remote_command("git", "-C", mirror, "fetch", "--prune", "origin", "+refs/heads/*:refs/heads/*")
+            # Forget the worktrees whose directory was removed after a previous ingestion
+            await run_command("git", "-C", mirror, "worktree", "prune", capture=False)
+        else:
+            # Clone next to the mirror and rename it once complete, so that an interrupted clone is never reused
+            partial_path = mirror_path.with_name(mirror_path.name + ".partial")
+            shutil.rmtree(partial_path, ignore_errors=True)
+            await _run_remote_command("git", "clone", "--bare", "--filter=blob:none", config.url, str(partial_path))
+            os.replace(partial_path, mirror_path)
+
+        revision = config.commit or config.branch or "HEAD"
+        local_path = os.path.abspath(config.local_path)
+        await run_command("git", "-C", mirror, "worktree", "add", "--detach", local_path, revision, capture=False)
+
+
+@asynccontextmanager
+async def _lock_file(lock_path: Path) -> AsyncIterator[None]:
+    """
+    Hold an exclusive lock on a file, shared with every coroutine and process that locks the same file.
 
-    if commit or partial_clone:
-        checkout_cmd = ["git", "-C", local_path]
+    The lock is taken with a non-blocking `flock`, retried every `LOCK_POLL_INTERVAL` seconds, so that waiting for it
+    blocks neither the event loop nor a worker thread. It is released when the file is closed. Where `fcntl` is not
+    available, no lock is taken.
 
-        if partial_clone:
-            subpath = config.subpath.lstrip("/")
-            if config.blob:
-                # When ingesting from a file url (blob/branch/path/file.txt), we need to remove the file name.
-                subpath = str(Path(subpath).parent.as_posix())
+    Parameters
+    ----------
+    lock_path : Path
+        The path to the lock file, created if needed.
+
+    Yields
+    ------
+    None
+        Control is yielded while the lock is held.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "ab") as lock_file:
+        while fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+        yield
+
+
+async def _run_remote_command(*args: str) -> None:
+    """
+    Run a Git command that contacts the remote repository.
+
+    Parameters
+    ----------
+    *args : str
+        The command and its arguments to execute.
+
+    Raises
+    ------
+    ValueError
+        If the error output of the command shows that the repository is missing or private.
+    """
+    try:
+        await run_command(*args, capture=False)
+    except RuntimeError as exc:
+        error_message = str(exc).lower()
+        if any(marker in error_message for marker in _REPO_NOT_FOUND_MARKERS):
+            raise ValueError("Repository not found, make sure it is public") from exc
+        raise
+
+
+async def clone_repos(
+    configs: Sequence[CloneConfig],
+    max_parallel: int = MAX_PARALLEL_CLONES,
+) -> List[Optional[BaseException]]:
+    """
+    Clone several repositories concurrently.
+
+    Each repository is cloned with `clone_repo`, with at most `max_parallel` clones running at once. A failed clone
+    does not interrupt the others: its exception is returned instead of raised.
+
+    Parameters
+    ----------
+    configs : Sequence[CloneConfig]
+        The configurations for cloning the repositories.
+    max_parallel : int
+        The maximum number of clones running at once, by default `MAX_PARALLEL_CLONES`.
+
+    Returns
+    -------
+    List[Optional[BaseException]]
+        For each configuration, in order, `None` if the clone succeeded, or the exception it raised.
+    """
+    semaphore = asyncio.Semaphore(max_parallel)
+
+    async def _clone(config: CloneConfig) -> None:
+        async with semaphore:
+            await clone_repo(config)
+
+    return await asyncio.gather(*(_clone(config) for config in configs), return_exceptions=True)
+
+
+def _get_sparse_checkout_paths(config: CloneConfig) -> List[str]:
+    """
+    Determine the directories to check out for a partial clone.
+
+    A subpath always defines the checkout. Otherwise, the directories are derived from the include patterns: the
+    literal part of each pattern, up to its last slash before any wildcard. If a pattern can match files anywhere in
+    the repository (e.g. `*.py`), the whole repository is needed and no sparse checkout is done.
+
+    Parameters
+    ----------
+    config : CloneConfig
+        The configuration for cloning the repository.
+
+    Returns
+    -------
+    List[str]
+        The directories to pass to `git sparse-checkout set`, or an empty list for a full checkout.
+    """
+    if config.subpath != "/":
+        subpath = config.subpath.lstrip("/")
+        if config.blob:
+            # When ingesting from a file url (blob/branch/path/file.txt), we need to remove the file name.
+            subpath = str(Path(subpath).parent.as_posix())
+        return [subpath]
 
-            checkout_cmd += ["sparse-checkout", "set", subpath]
+    if not config.include_patterns:
+        return []
 
-        if commit:
-            checkout_cmd += ["checkout", commit]
+    directories = set()
+    for pattern in config.include_patterns:
+        literal = pattern
+        for wildcard in WILDCARD_CHARS:
+            literal = literal.split(wildcard, 1)[0]
+        directory = literal.rpartition("/")[0]
+        if not directory:
+            return []
+        directories.add(directory)
 
-        # Check out the specific commit and/or subpath
-        await run_command(*checkout_cmd)
+    return sorted(directories)
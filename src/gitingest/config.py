@@ -1,13 +1,21 @@
 """Configuration file for the project."""
 
+import os
 import tempfile
 from pathlib import Path
+from typing import Optional
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 MAX_DIRECTORY_DEPTH = 20  # Maximum depth of directory traversal
 MAX_FILES = 10_000  # Maximum number of files to process
 MAX_TOTAL_SIZE_BYTES = 500 * 1024 * 1024  # 500 MB
+MAX_PARALLEL_CLONES = 16  # Maximum number of repositories cloned at once by `clone_repos`
 
 OUTPUT_FILE_NAME = "digest.txt"
 
 TMP_BASE_PATH = Path(tempfile.gettempdir()) / "gitingest"
+
+# Directory of the bare mirrors reused across clones, taken from `GITINGEST_CACHE`; no mirrors are kept when unset
+CLONE_CACHE_PATH: Optional[Path] = (
+    Path(os.environ["GITINGEST_CACHE"]).expanduser() if os.environ.get("GITINGEST_CACHE") else None
+)
@@ -18,6 +18,8 @@ async def ingest_async(
     exclude_patterns: Optional[Union[str, Set[str]]] = None,
     branch: Optional[str] = None,
     output: Optional[str] = None,
+    jobs: int = 1,
+    probe: bool = False,
 ) -> Tuple[str, str, str]:
     """
     Main entry point for ingesting a source and processing its contents.
@@ -41,6 +43,10 @@ async def ingest_async(
         The branch to clone and ingest. If `None`, the default branch is used.
     output : str, optional
         File path where the summary and content should be written. If `None`, the results are not written to a file.
+    jobs : int
+        Number of threads used to walk the directory tree, by default 1.
+    probe : bool
+        Whether to check that the repository exists before cloning it, by default False.
 
     Returns
     -------
@@ -71,7 +77,7 @@ async def ingest_async(
             query.branch = selected_branch
 
             clone_config = query.extract_clone_config()
-            clone_coroutine = clone_repo(clone_config)
+            clone_coroutine = clone_repo(clone_config, probe=probe)
 
             if inspect.iscoroutine(clone_coroutine):
                 if asyncio.get_event_loop().is_running():
@@ -83,7 +89,7 @@ async def ingest_async(
 
             repo_cloned = True
 
-        summary, tree, content = ingest_query(query)
+        summary, tree, content = ingest_query(query, jobs=jobs)
 
         if output is not None:
             with open(output, "w", encoding="utf-8") as f:
@@ -103,6 +109,8 @@ def ingest(
     exclude_patterns: Optional[Union[str, Set[str]]] = None,
     branch: Optional[str] = None,
     output: Optional[str] = None,
+    jobs: int = 1,
+    probe: bool = False,
 ) -> Tuple[str, str, str]:
     """
     Synchronous version of ingest_async.
@@ -126,6 +134,10 @@ def ingest(
         The branch to clone and ingest. If `None`, the default branch is used.
     output : str, optional
         File path where the summary and content should be written. If `None`, the results are not written to a file.
+    jobs : int
+        Number of threads used to walk the directory tree, by default 1.
+    probe : bool
+        Whether to check that the repository exists before cloning it, by default False.
 
     Returns
     -------
@@ -147,5 +159,7 @@ def ingest(
             exclude_patterns=exclude_patterns,
             branch=branch,
             output=output,
+            jobs=jobs,
+            probe=probe,
         )
     )
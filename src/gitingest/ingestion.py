@@ -1,22 +1,38 @@
 """Functions to ingest and analyze a codebase directory or single file."""
 
+import logging
+import os
 import warnings
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 
 from gitingest.config import MAX_DIRECTORY_DEPTH, MAX_FILES, MAX_TOTAL_SIZE_BYTES
 from gitingest.output_formatters import format_node
 from gitingest.query_parsing import IngestionQuery
 from gitingest.schemas import FileSystemNode, FileSystemNodeType, FileSystemStats
-from gitingest.utils.ingestion_utils import _should_exclude, _should_include
+from gitingest.utils.ingestion_utils import (
+    _compile_patterns,
+    _literal_prefixes,
+    _PatternMatcher,
+    _should_exclude,
+    _should_include,
+)
 
 try:
     import tomllib  # type: ignore[import]
 except ImportError:
     import tomli as tomllib
 
+logger = logging.getLogger(__name__)
 
-def ingest_query(query: IngestionQuery) -> Tuple[str, str, str]:
+
+class _LimitReached(Exception):
+    """Raised to stop the walk once the file count or total size limit is reached."""
+
+
+def ingest_query(query: IngestionQuery, jobs: int = 1) -> Tuple[str, str, str]:
     """
     Run the ingestion process for a parsed query.
 
@@ -28,6 +44,9 @@ def ingest_query(query: IngestionQuery) -> Tuple[str, str, str]:
     ----------
     query : IngestionQuery
         The parsed query object containing information about the repository and query parameters.
+    jobs : int
+        Number of threads used to walk the directory tree, by default 1. With more threads, which files are kept once
+        the file count or total size limit is reached depends on thread scheduling.
 
     Returns
     -------
@@ -53,14 +72,16 @@ def ingest_query(query: IngestionQuery) -> Tuple[str, str, str]:
             raise ValueError(f"Path {path} is not a file")
 
         relative_path = path.relative_to(query.local_path)
+        size = path.stat().st_size
 
         file_node = FileSystemNode(
             name=path.name,
             type=FileSystemNodeType.FILE,
-            size=path.stat().st_size,
+            size=size,
             file_count=1,
             path_str=str(relative_path),
             path=path,
+            skipped=size > query.max_file_size,
         )
 
         if not file_node.content:
@@ -77,11 +98,13 @@ def ingest_query(query: IngestionQuery) -> Tuple[str, str, str]:
 
     stats = FileSystemStats()
 
-    _process_node(
-        node=root_node,
-        query=query,
-        stats=stats,
-    )
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            _process_node(node=root_node, query=query, stats=stats, executor=executor)
+    else:
+        _process_node(node=root_node, query=query, stats=stats)
+
+    _log_skipped_entries(stats)
 
     return format_node(root_node, query)
 
@@ -146,7 +169,8 @@ def apply_gitingest_file(path: Path, query: IngestionQuery) -> None:
     if query.ignore_patterns is None:
         query.ignore_patterns = valid_patterns
     else:
-        query.ignore_patterns.update(valid_patterns)
+        # Build a new set rather than updating in place: the patterns may be the shared, frozen defaults
+        query.ignore_patterns = set(query.ignore_patterns) | valid_patterns
 
     return
 
@@ -155,134 +179,297 @@ def _process_node(
     node: FileSystemNode,
     query: IngestionQuery,
     stats: FileSystemStats,
+    executor: Optional[Executor] = None,
 ) -> None:
     """
-    Process a file or directory item within a directory.
+    Process a directory node and everything below it.
+
+    The tree is walked iteratively with a work queue rather than with one recursive call per directory. Each
+    directory is listed once: files and symlinks are attached to it straight away, while subdirectories are queued
+    and only attached to their parent once their own contents are known.
 
-    This function handles each file or directory item, checking if it should be included or excluded based on the
-    provided patterns. It handles symlinks, directories, and files accordingly.
+    If an executor is given, each subdirectory of `node` is walked as a separate task on it. The subtrees themselves
+    are walked sequentially, so a worker never blocks waiting on another task of the same executor.
 
     Parameters
     ----------
     node : FileSystemNode
-        The current directory or file node being processed.
+        The directory node to process.
     query : IngestionQuery
         The parsed query object containing information about the repository and query parameters.
     stats : FileSystemStats
         Statistics tracking object for the total file count and size.
+    executor : Executor, optional
+        Executor used to walk the subdirectories of this node concurrently, by default None.
     """
+    ignore_matcher = _compile_patterns(frozenset(query.ignore_patterns)) if query.ignore_patterns else None
+    include_matcher = include_prefixes = None
+    if query.include_patterns:
+        include_matcher = _compile_patterns(frozenset(query.include_patterns))
+        include_prefixes = _literal_prefixes(frozenset(query.include_patterns))
+
+    queue: Deque[FileSystemNode] = deque([node])
+    walked: List[Tuple[FileSystemNode, FileSystemNode]] = []
+    pending: Dict[Future, FileSystemNode] = {}
+
+    while queue:
+        directory = queue.popleft()
+        try:
+            subdirectories = _process_directory(
+                directory, query, stats, ignore_matcher, include_matcher, include_prefixes
+            )
+        except _LimitReached:
+            # Keep what was walked so far, but list no further directories
+            break
 
-    if limit_exceeded(stats, node.depth):
-        return
+        for child_directory_node in subdirectories:
+            if executor is not None and directory is node:
+                future = executor.submit(_process_node, node=child_directory_node, query=query, stats=stats)
+                pending[future] = child_directory_node
+            else:
+                walked.append((child_directory_node, directory))
+                queue.append(child_directory_node)
 
-    for sub_path in node.path.iterdir():
+    # Directories are queued after their parent, so going backwards completes each one before it is attached
+    for child_directory_node, parent_node in reversed(walked):
+        _add_child_directory(parent_node, child_directory_node, drop_empty=include_matcher is not None)
 
-        if query.ignore_patterns and _should_exclude(sub_path, query.local_path, query.ignore_patterns):
-            continue
+    for future in as_completed(pending):
+        future.result()
+        _add_child_directory(node, pending[future], drop_empty=include_matcher is not None)
 
-        if query.include_patterns and not _should_include(sub_path, query.local_path, query.include_patterns):
-            continue
 
-        if sub_path.is_symlink():
-            _process_symlink(path=sub_path, parent_node=node, stats=stats, local_path=query.local_path)
-        elif sub_path.is_file():
-            _process_file(path=sub_path, parent_node=node, stats=stats, local_path=query.local_path)
-        elif sub_path.is_dir():
+def _process_directory(
+    node: FileSystemNode,
+    query: IngestionQuery,
+    stats: FileSystemStats,
+    ignore_matcher: Optional[_PatternMatcher],
+    include_matcher: Optional[_PatternMatcher],
+    include_prefixes: Optional[Tuple[str, ...]],
+) -> List[FileSystemNode]:
+    """
+    List a single directory, attaching its files and symlinks and returning its subdirectories.
+
+    This function handles each item of the directory, checking if it should be included or excluded based on the
+    provided patterns. Files and symlinks are added to `node`; subdirectories are returned unprocessed so that the
+    caller can schedule them.
 
+    Parameters
+    ----------
+    node : FileSystemNode
+        The directory node to list.
+    query : IngestionQuery
+        The parsed query object containing information about the repository and query parameters.
+    stats : FileSystemStats
+        Statistics tracking object for the total file count and size.
+    ignore_matcher : _PatternMatcher, optional
+        The compiled ignore patterns.
+    include_matcher : _PatternMatcher, optional
+        The compiled include patterns.
+    include_prefixes : Tuple[str, ...], optional
+        The literal prefixes of the include patterns.
+
+    Returns
+    -------
+    List[FileSystemNode]
+        The subdirectories of `node` that should be walked.
+
+    Raises
+    ------
+    _LimitReached
+        If the file count or total size limit is reached.
+    """
+    if limit_exceeded(stats, node.depth):
+        if stats.max_files_reached or stats.max_total_size_reached:
+            raise _LimitReached
+        return []
+
+    # Drain the listing up front so the directory handle is closed before the next directory is opened
+    with os.scandir(node.path) as it:
+        entries = list(it)
+
+    subdirectories: List[FileSystemNode] = []
+
+    # Every entry path starts with the base path, so the relative path is a plain slice of it
+    base_path_len = len(os.path.join(str(query.local_path), ""))
+    selected = [(entry, entry.path[base_path_len:]) for entry in entries]
+
+    # Filter in separate passes, so that the loop below does not test for patterns when there are none.
+    # Ignored directories are skipped here, before they are ever listed.
+    if ignore_matcher is not None:
+        selected = [
+            (entry, rel_path)
+            for entry, rel_path in selected
+            if not _should_exclude(rel_path, entry.is_dir(), ignore_matcher)
+        ]
+
+    if include_matcher is not None:
+        selected = [
+            (entry, rel_path)
+            for entry, rel_path in selected
+            if _should_include(rel_path, entry.is_dir(), include_matcher, include_prefixes or ())
+        ]
+
+    for entry, rel_path in selected:
+        sub_path = Path(entry.path)
+
+        # `DirEntry` caches the file type from the directory listing, so these checks avoid extra `stat` calls
+        if entry.is_symlink():
+            _process_symlink(path=sub_path, name=entry.name, rel_path=rel_path, parent_node=node, stats=stats)
+        elif entry.is_file(follow_symlinks=False):
+            _process_file(
+                path=sub_path,
+                name=entry.name,
+                rel_path=rel_path,
+                size=entry.stat(follow_symlinks=False).st_size,
+                max_file_size=query.max_file_size,
+                parent_node=node,
+                stats=stats,
+            )
+        elif entry.is_dir(follow_symlinks=False):
             child_directory_node = FileSystemNode(
-                name=sub_path.name,
+                name=entry.name,
                 type=FileSystemNodeType.DIRECTORY,
-                path_str=str(sub_path.relative_to(query.local_path)),
+                path_str=rel_path,
                 path=sub_path,
                 depth=node.depth + 1,
             )
-
-            _process_node(
-                node=child_directory_node,
-                query=query,
-                stats=stats,
-            )
-            node.children.append(child_directory_node)
-            node.size += child_directory_node.size
-            node.file_count += child_directory_node.file_count
-            node.dir_count += 1 + child_directory_node.dir_count
+            subdirectories.append(child_directory_node)
         else:
-            print(f"Warning: {sub_path} is an unknown file type, skipping")
+            with stats.lock:
+                stats.skipped_unknown_type += 1
 
-    node.sort_children()
+    return subdirectories
 
 
-def _process_symlink(path: Path, parent_node: FileSystemNode, stats: FileSystemStats, local_path: Path) -> None:
+def _add_child_directory(node: FileSystemNode, child_directory_node: FileSystemNode, drop_empty: bool) -> None:
+    """
+    Attach a processed subdirectory to its parent and aggregate its statistics.
+
+    Parameters
+    ----------
+    node : FileSystemNode
+        The parent directory node.
+    child_directory_node : FileSystemNode
+        The fully processed subdirectory node.
+    drop_empty : bool
+        Whether to leave the subdirectory out if nothing was found in it. This is used with include patterns, where
+        directories are entered speculatively.
+    """
+    if drop_empty and not child_directory_node.children:
+        return
+
+    node.children.append(child_directory_node)
+    node.size += child_directory_node.size
+    node.file_count += child_directory_node.file_count
+    node.dir_count += 1 + child_directory_node.dir_count
+
+
+def _process_symlink(
+    path: Path,
+    name: str,
+    rel_path: str,
+    parent_node: FileSystemNode,
+    stats: FileSystemStats,
+) -> None:
     """
     Process a symlink in the file system.
 
-    This function checks the symlink's target.
+    This function records the name of the symlink's target, so that it is not read again when the node is rendered.
 
     Parameters
     ----------
     path : Path
         The full path of the symlink.
+    name : str
+        The name of the symlink.
+    rel_path : str
+        The path of the symlink, relative to the base path of the repository or directory being processed.
     parent_node : FileSystemNode
         The parent directory node.
     stats : FileSystemStats
         Statistics tracking object for the total file count and size.
-    local_path : Path
-        The base path of the repository or directory being processed.
     """
     child = FileSystemNode(
-        name=path.name,
+        name=name,
         type=FileSystemNodeType.SYMLINK,
-        path_str=str(path.relative_to(local_path)),
+        path_str=rel_path,
         path=path,
         depth=parent_node.depth + 1,
+        symlink_target=Path(os.readlink(path)).name,
     )
-    stats.total_files += 1
+    with stats.lock:
+        stats.total_files += 1
     parent_node.children.append(child)
     parent_node.file_count += 1
 
 
-def _process_file(path: Path, parent_node: FileSystemNode, stats: FileSystemStats, local_path: Path) -> None:
+def _process_file(
+    path: Path,
+    name: str,
+    rel_path: str,
+    size: int,
+    max_file_size: int,
+    parent_node: FileSystemNode,
+    stats: FileSystemStats,
+) -> None:
     """
     Process a file in the file system.
 
-    This function checks the file's size, increments the statistics, and reads its content.
-    If the file size exceeds the maximum allowed, it raises an error.
+    This function checks the file's size, increments the statistics, and adds a node for the file.
+    A file larger than `max_file_size` is still listed, but marked as skipped so that its content is never read; it
+    does not count towards the total size limit.
 
     Parameters
     ----------
     path : Path
         The full path of the file.
+    name : str
+        The name of the file.
+    rel_path : str
+        The path of the file, relative to the base path of the repository or directory being processed.
+    size : int
+        The size of the file in bytes, as reported by the directory listing.
+    max_file_size : int
+        The maximum size of a file whose content is read, in bytes.
     parent_node : FileSystemNode
         The dictionary to accumulate the results.
     stats : FileSystemStats
         Statistics tracking object for the total file count and size.
-    local_path : Path
-        The base path of the repository or directory being processed.
+
+    Raises
+    ------
+    _LimitReached
+        If the file count limit is reached.
     """
-    file_size = path.stat().st_size
-    if stats.total_size + file_size > MAX_TOTAL_SIZE_BYTES:
-        print(f"Skipping file {path}: would exceed total size limit")
-        return
+    skipped = size > max_file_size
 
-    stats.total_files += 1
-    stats.total_size += file_size
+    with stats.lock:
+        if not skipped and stats.total_size + size > MAX_TOTAL_SIZE_BYTES:
+            stats.skipped_over_total_size += 1
+            return
 
-    if stats.total_files > MAX_FILES:
-        print(f"Maximum file limit ({MAX_FILES}) reached")
-        return
+        stats.total_files += 1
+        if not skipped:
+            stats.total_size += size
+
+        if stats.total_files > MAX_FILES:
+            stats.max_files_reached = True
+            raise _LimitReached
 
     child = FileSystemNode(
-        name=path.name,
+        name=name,
         type=FileSystemNodeType.FILE,
-        size=file_size,
+        size=size,
         file_count=1,
-        path_str=str(path.relative_to(local_path)),
+        path_str=rel_path,
         path=path,
         depth=parent_node.depth + 1,
+        skipped=skipped,
     )
 
     parent_node.children.append(child)
-    parent_node.size += file_size
+    parent_node.size += size
     parent_node.file_count += 1
 
 
@@ -291,7 +478,8 @@ def limit_exceeded(stats: FileSystemStats, depth: int) -> bool:
     Check if any of the traversal limits have been exceeded.
 
     This function checks if the current traversal has exceeded any of the configured limits:
-    maximum directory depth, maximum number of files, or maximum total size in bytes.
+    maximum directory depth, maximum number of files, or maximum total size in bytes. The limit that was hit is
+    recorded in `stats`, to be reported once the walk is over.
 
     Parameters
     ----------
@@ -305,16 +493,46 @@ def limit_exceeded(stats: FileSystemStats, depth: int) -> bool:
     bool
         True if any limit has been exceeded, False otherwise.
     """
-    if depth > MAX_DIRECTORY_DEPTH:
-        print(f"Maximum depth limit ({MAX_DIRECTORY_DEPTH}) reached")
-        return True
+    with stats.lock:
+        if depth > MAX_DIRECTORY_DEPTH:
+            stats.skipped_too_deep += 1
+            return True
 
-    if stats.total_files >= MAX_FILES:
-        print(f"Maximum file limit ({MAX_FILES}) reached")
-        return True  # TODO: end recursion
+        if stats.total_files >= MAX_FILES:
+            stats.max_files_reached = True
+            return True
 
-    if stats.total_size >= MAX_TOTAL_SIZE_BYTES:
-        print(f"Maxumum total size limit ({MAX_TOTAL_SIZE_BYTES/1024/1024:.1f}MB) reached")
-        return True  # TODO: end recursion
+        if stats.total_size >= MAX_TOTAL_SIZE_BYTES:
+            stats.max_total_size_reached = True
+            return True
 
     return False
+
+
+def _log_skipped_entries(stats: FileSystemStats) -> None:
+    """
+    Log a summary of the limits reached and the entries skipped during the walk.
+
+    Parameters
+    ----------
+    stats : FileSystemStats
+        Statistics tracking object for the total file count and size.
+    """
+    if stats.max_files_reached:
+        logger.warning("Maximum file limit (%d) reached", MAX_FILES)
+
+    if stats.max_total_size_reached:
+        logger.warning("Maximum total size limit (%.1fMB) reached", MAX_TOTAL_SIZE_BYTES / 1024 / 1024)
+
+    if stats.skipped_over_total_size:
+        logger.warning("Skipped %d files that would exceed the total size limit", stats.skipped_over_total_size)
+
+    if stats.skipped_too_deep:
+        logger.warning(
+            "Skipped %d directories beyond the maximum depth (%d)",
+            stats.skipped_too_deep,
+            MAX_DIRECTORY_DEPTH,
+        )
+
+    if stats.skipped_unknown_type:
+        logger.warning("Skipped %d entries of unknown file type", stats.skipped_unknown_type)
@@ -1,11 +1,19 @@
 """Functions to ingest and analyze a codebase directory or single file."""
 
-from typing import Optional, Tuple
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from io import StringIO
+from typing import Callable, List, Optional, Tuple
 
 import tiktoken
 
 from gitingest.query_parsing import IngestionQuery
 from gitingest.schemas import FileSystemNode, FileSystemNodeType
+from gitingest.utils.file_utils import prefetch_file
+
+TOKEN_CHUNK_SIZE: int = 1024 * 1024  # Characters of text tokenized per batch item
+READAHEAD_DEPTH: int = 16  # Number of files of a directory prefetched ahead of the one being read
 
 
 def format_node(node: FileSystemNode, query: IngestionQuery) -> Tuple[str, str, str]:
@@ -35,14 +43,26 @@ def format_node(node: FileSystemNode, query: IngestionQuery) -> Tuple[str, str,
         summary += f"File: {node.name}\n"
         summary += f"Lines: {len(node.content.splitlines()):,}\n"
 
+    # The walk leaves the children unordered, the tree and the contents both follow the sorted order
+    _sort_tree(node)
     tree = "Directory structure:\n" + _create_tree_structure(query, node)
-    _create_tree_structure(query, node)
 
-    content = _gather_file_contents(node)
+    # Files are read while the text gathered so far is tokenized on another thread
+    with _TokenCounter() as token_counter:
+        token_counter.feed(tree)
+
+        out = StringIO()
+
+        def _write(chunk: str) -> None:
+            out.write(chunk)
+            token_counter.feed(chunk)
 
-    token_estimate = _format_token_count(tree + content)
-    if token_estimate:
-        summary += f"\nEstimated tokens: {token_estimate}"
+        _write_file_contents(node, _write)
+        content = out.getvalue()
+
+        total_tokens = token_counter.total()
+    if total_tokens is not None:
+        summary += f"\nEstimated tokens: {_format_token_count(total_tokens)}"
 
     return summary, tree, content
 
@@ -86,10 +106,7 @@ def _create_summary_prefix(query: IngestionQuery, single_file: bool = False) ->
 
 def _gather_file_contents(node: FileSystemNode) -> str:
     """
-    Recursively gather contents of all files under the given node.
-
-    This function recursively processes a directory node and gathers the contents of all files
-    under that node. It returns the concatenated content of all files as a single string.
+    Gather the contents of all files under the given node.
 
     Parameters
     ----------
@@ -101,11 +118,55 @@ def _gather_file_contents(node: FileSystemNode) -> str:
     str
         The concatenated content of all files under the given node.
     """
+    out = StringIO()
+    _write_file_contents(node, out.write)
+    return out.getvalue()
+
+
+def _write_file_contents(node: FileSystemNode, write: Callable[[str], object]) -> None:
+    """
+    Write the contents of all files under the given node, in order.
+
+    The contents of sibling nodes are separated by a newline. Each file is written as its own chunk, so the contents
+    go to a single buffer instead of being joined into a string for every subtree.
+
+    While a file is read, the OS is asked to prefetch the file `READAHEAD_DEPTH` positions further in the same
+    directory, so that disk reads overlap with decoding and tokenizing.
+
+    Parameters
+    ----------
+    node : FileSystemNode
+        The current directory or file node being processed.
+    write : Callable[[str], object]
+        The function called with the content of each file and with each separator.
+    """
     if node.type != FileSystemNodeType.DIRECTORY:
-        return node.content_string
+        write(node.content_string)
+        return
+
+    children = node.children
+    for child in children[:READAHEAD_DEPTH]:
+        _prefetch(child)
 
-    # Recursively gather contents of all files under the current directory
-    return "\n".join(_gather_file_contents(child) for child in node.children)
+    for i, child in enumerate(children):
+        if i + READAHEAD_DEPTH < len(children):
+            _prefetch(children[i + READAHEAD_DEPTH])
+        if i:
+            write("\n")
+        _write_file_contents(child, write)
+
+
+def _prefetch(node: FileSystemNode) -> None:
+    """
+    Prefetch the content of a file node whose content will be read.
+
+    Parameters
+    ----------
+    node : FileSystemNode
+        The node to prefetch. Directories, symlinks and skipped files are ignored.
+    """
+    if node.type == FileSystemNodeType.FILE and not node.skipped:
+        prefetch_file(node.path)
 
 
 def _create_tree_structure(query: IngestionQuery, node: FileSystemNode, prefix: str = "", is_last: bool = True) -> str:
@@ -131,52 +192,167 @@ def _create_tree_structure(query: IngestionQuery, node: FileSystemNode, prefix:
     str
         A string representing the directory structure formatted as a tree.
     """
-    if not node.name:
-        # If no name is present, use the slug as the top-level directory name
-        node.name = query.slug
+    lines = []
+    _write_tree_structure(query, node, lines.append, prefix=prefix, is_last=is_last)
+    return "".join(lines)
+
+
+def _write_tree_structure(
+    query: IngestionQuery,
+    node: FileSystemNode,
+    write: Callable[[str], object],
+    prefix: str = "",
+    is_last: bool = True,
+) -> None:
+    """
+    Write the tree-like representation of the file structure, one line per node.
 
-    tree_str = ""
-    current_prefix = "└── " if is_last else "├── "
+    The tree is walked depth-first with an explicit stack, so deep trees neither recurse nor copy the prefix of a
+    directory more than once. The children of each directory are written in their current order.
 
-    # Indicate directories with a trailing slash
-    display_name = node.name
-    if node.type == FileSystemNodeType.DIRECTORY:
-        display_name += "/"
-    elif node.type == FileSystemNodeType.SYMLINK:
-        display_name += " -> " + node.path.readlink().name
+    Parameters
+    ----------
+    query : IngestionQuery
+        The parsed query object containing information about the repository and query parameters.
+    node : FileSystemNode
+        The root of the tree to write.
+    write : Callable[[str], object]
+        The function called with each line of the tree.
+    prefix : str
+        A string used for indentation and formatting of the tree structure, by default "".
+    is_last : bool
+        A flag indicating whether the root node is the last in its directory, by default True.
+    """
+    stack: List[Tuple[FileSystemNode, str, bool]] = [(node, prefix, is_last)]
+
+    while stack:
+        node, prefix, is_last = stack.pop()
 
-    tree_str += f"{prefix}{current_prefix}{display_name}\n"
+        if not node.name:
+            # If no name is present, use the slug as the top-level directory name
+            node.name = query.slug
 
-    if node.type == FileSystemNodeType.DIRECTORY and node.children:
-        prefix += "    " if is_last else "│   "
-        for i, child in enumerate(node.children):
-            tree_str += _create_tree_structure(query, node=child, prefix=prefix, is_last=i == len(node.children) - 1)
-    return tree_str
+        # Indicate directories with a trailing slash
+        display_name = node.name
+        if node.type == FileSystemNodeType.DIRECTORY:
+            display_name += "/"
+        elif node.type == FileSystemNodeType.SYMLINK:
+            display_name += f" -> {node.symlink_target}"
 
+        write(f"{prefix}{'└── ' if is_last else '├── '}{display_name}\n")
 
-def _format_token_count(text: str) -> Optional[str]:
+        if node.type == FileSystemNodeType.DIRECTORY and node.children:
+            child_prefix = prefix + ("    " if is_last else "│   ")
+            last_index = len(node.children) - 1
+            # Push in reverse so that the children are written in order
+            for i in range(last_index, -1, -1):
+                stack.append((node.children[i], child_prefix, i == last_index))
+
+
+def _sort_tree(node: FileSystemNode) -> None:
+    """
+    Sort the children of every directory under the given node, in place.
+
+    Parameters
+    ----------
+    node : FileSystemNode
+        The root of the tree to sort.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.type == FileSystemNodeType.DIRECTORY:
+            node.sort_children()
+            stack.extend(node.children)
+
+
+class _TokenCounter:
     """
-    Return a human-readable string representing the token count of the given text.
+    Count the tokens of a text that is fed piece by piece, tokenizing on a background thread.
 
-    E.g., '120' -> '120', '1200' -> '1.2k', '1200000' -> '1.2M'.
+    Fed pieces are buffered until `TOKEN_CHUNK_SIZE` more characters are pending. The buffer is then split with
+    `_split_text` and its complete chunks are tokenized on a worker thread, while the caller goes on producing text.
+    tiktoken releases the GIL while encoding, so reading files and tokenizing overlap.
+
+    Use it as a context manager, so the worker thread is shut down even if producing the text fails.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending: List[Future] = []
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._flush_at = TOKEN_CHUNK_SIZE
+
+    def __enter__(self) -> "_TokenCounter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def feed(self, text: str) -> None:
+        """
+        Add text to be counted.
+
+        Parameters
+        ----------
+        text : str
+            The next piece of the text.
+        """
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered < self._flush_at:
+            return
+
+        chunks = _split_text("".join(self._buffer), TOKEN_CHUNK_SIZE)
+        remainder = chunks.pop()
+        self._buffer = [remainder]
+        self._buffered = len(remainder)
+        # Text without a chunk boundary stays pending, so wait for more text before joining it again
+        self._flush_at = self._buffered + TOKEN_CHUNK_SIZE
+        if chunks:
+            self._pending.append(self._executor.submit(self._count, chunks))
+
+    def total(self) -> Optional[int]:
+        """
+        Count the remaining text and return the total number of tokens.
+
+        Returns
+        -------
+        int, optional
+            The number of tokens of all the text fed, or `None` if an error occurs.
+        """
+        try:
+            total_tokens = self._count(_split_text("".join(self._buffer), TOKEN_CHUNK_SIZE))
+            return total_tokens + sum(future.result() for future in self._pending)
+        except (ValueError, UnicodeEncodeError) as exc:
+            print(exc)
+            return None
+
+    @staticmethod
+    def _count(chunks: List[str]) -> int:
+        encoding = _get_encoding()
+        return sum(map(len, encoding.encode_ordinary_batch(chunks, num_threads=os.cpu_count() or 1)))
+
+
+def _format_token_count(total_tokens: int) -> str:
+    """
+    Return a human-readable string representing a number of tokens.
+
+    E.g., 120 -> '120', 1200 -> '1.2k', 1200000 -> '1.2M'.
 
     Parameters
     ----------
-    text : str
-        The text string for which the token count is to be estimated.
+    total_tokens : int
+        The number of tokens.
 
     Returns
     -------
-    str, optional
-        The formatted number of tokens as a string (e.g., '1.2k', '1.2M'), or `None` if an error occurs.
+    str
+        The formatted number of tokens as a string (e.g., '1.2k', '1.2M').
     """
-    try:
-        encoding = tiktoken.get_encoding("cl100k_base")
-        total_tokens = len(encoding.encode(text, disallowed_special=()))
-    except (ValueError, UnicodeEncodeError) as exc:
-        print(exc)
-        return None
-
     if total_tokens >= 1_000_000:
         return f"{total_tokens / 1_000_000:.1f}M"
 
@@ -184,3 +360,49 @@ def _format_token_count(text: str) -> Optional[str]:
         return f"{total_tokens / 1_000:.1f}k"
 
     return str(total_tokens)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> tiktoken.Encoding:
+    """
+    Load the tokenizer used for token estimates once per process.
+
+    Returns
+    -------
+    tiktoken.Encoding
+        The `cl100k_base` encoding.
+    """
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def _split_text(text: str, chunk_size: int) -> List[str]:
+    """
+    Split text into chunks of at least `chunk_size` characters that can be tokenized independently.
+
+    Chunks only end on a newline that is followed by a non-whitespace character. No token spans such a boundary,
+    so the token counts of the chunks add up to the token count of the whole text.
+
+    Parameters
+    ----------
+    text : str
+        The text to split.
+    chunk_size : int
+        The minimum length of each chunk but the last.
+
+    Returns
+    -------
+    List[str]
+        The chunks, in order.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > chunk_size:
+        end = text.find("\n", start + chunk_size)
+        while end != -1 and end + 1 < len(text) and text[end + 1].isspace():
+            end = text.find("\n", end + 1)
+        if end == -1 or end + 1 == len(text):
+            break
+        chunks.append(text[start : end + 1])
+        start = end + 1
+    chunks.append(text[start:])
+    return chunks
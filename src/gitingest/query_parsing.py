@@ -1,23 +1,25 @@
 """This module contains functions to parse and validate input sources and patterns."""
 
-import re
 import uuid
 import warnings
 from pathlib import Path
-from typing import List, Optional, Set, Union
-from urllib.parse import unquote, urlparse
+from typing import AbstractSet, FrozenSet, List, Optional, Set, Tuple, Union
+from urllib.parse import ParseResult, unquote, urlparse
 
 from gitingest.config import TMP_BASE_PATH
 from gitingest.schemas import IngestionQuery
 from gitingest.utils.exceptions import InvalidPatternError
-from gitingest.utils.git_utils import check_repo_exists, fetch_remote_branch_list
+from gitingest.utils.git_utils import check_repos_exist, fetch_remote_branch_list
 from gitingest.utils.ignore_patterns import DEFAULT_IGNORE_PATTERNS
 from gitingest.utils.query_parser_utils import (
+    _KNOWN_GIT_HOSTS_RE,
     KNOWN_GIT_HOSTS,
     _get_user_and_repo_from_path,
     _is_valid_git_commit_hash,
     _is_valid_pattern,
+    _match_git_url,
     _normalize_pattern,
+    _split_repo_path,
     _validate_host,
     _validate_url_scheme,
 )
@@ -57,44 +59,37 @@ async def parse_query(
     """
 
     # Determine the parsing method based on the source type
-    if from_web or urlparse(source).scheme in ("https", "http") or any(h in source for h in KNOWN_GIT_HOSTS):
+    parsed_url = urlparse(source)
+    if from_web or parsed_url.scheme in ("https", "http") or _KNOWN_GIT_HOSTS_RE.search(source):
         # We either have a full URL or a domain-less slug
-        query = await _parse_remote_repo(source)
+        query = await _parse_remote_repo(source, parsed_url)
     else:
         # Local path scenario
         query = _parse_local_dir_path(source)
 
-    # Combine default ignore patterns + custom patterns
-    ignore_patterns_set = DEFAULT_IGNORE_PATTERNS.copy()
+    # Combine default ignore patterns + custom patterns. The defaults are frozen, so a new set is only built when
+    # custom patterns change them.
+    ignore_patterns_set: AbstractSet[str] = DEFAULT_IGNORE_PATTERNS
     if ignore_patterns:
-        ignore_patterns_set.update(_parse_patterns(ignore_patterns))
+        ignore_patterns_set = DEFAULT_IGNORE_PATTERNS | _parse_patterns(ignore_patterns)
 
     # Process include patterns and override ignore patterns accordingly
     if include_patterns:
         parsed_include = _parse_patterns(include_patterns)
-        # Override ignore patterns with include patterns
-        ignore_patterns_set = set(ignore_patterns_set) - set(parsed_include)
+        # Override ignore patterns with include patterns, keeping the same set when none of them is ignored
+        if not parsed_include.isdisjoint(ignore_patterns_set):
+            ignore_patterns_set = ignore_patterns_set - parsed_include
     else:
         parsed_include = None
 
-    return IngestionQuery(
-        user_name=query.user_name,
-        repo_name=query.repo_name,
-        url=query.url,
-        subpath=query.subpath,
-        local_path=query.local_path,
-        slug=query.slug,
-        id=query.id,
-        type=query.type,
-        branch=query.branch,
-        commit=query.commit,
-        max_file_size=max_file_size,
-        ignore_patterns=ignore_patterns_set,
-        include_patterns=parsed_include,
-    )
+    # The query was built by this module and is not shared, so it can be completed in place
+    query.max_file_size = max_file_size
+    query.ignore_patterns = ignore_patterns_set
+    query.include_patterns = parsed_include
+    return query
 
 
-async def _parse_remote_repo(source: str) -> IngestionQuery:
+async def _parse_remote_repo(source: str, parsed_url: Optional[ParseResult] = None) -> IngestionQuery:
     """
     Parse a repository URL into a structured query dictionary.
 
@@ -107,35 +102,23 @@ async def _parse_remote_repo(source: str) -> IngestionQuery:
     ----------
     source : str
         The URL or domain-less slug to parse.
+    parsed_url : ParseResult, optional
+        The result of `urlparse(source)` if the caller already has it, by default None. It is only reused if
+        unquoting leaves the source unchanged.
 
     Returns
     -------
     IngestionQuery
         A dictionary containing the parsed details of the repository.
     """
-    source = unquote(source)
-
-    # Attempt to parse
-    parsed_url = urlparse(source)
-
-    if parsed_url.scheme:
-        _validate_url_scheme(parsed_url.scheme)
-        _validate_host(parsed_url.netloc.lower())
-
-    else:  # Will be of the form 'host/user/repo' or 'user/repo'
-        tmp_host = source.split("/")[0].lower()
-        if "." in tmp_host:
-            _validate_host(tmp_host)
-        else:
-            # No scheme, no domain => user typed "user/repo", so we'll guess the domain.
-            host = await try_domains_for_user_and_repo(*_get_user_and_repo_from_path(source))
-            source = f"{host}/{source}"
-
-        source = "https://" + source
-        parsed_url = urlparse(source)
+    unquoted_source = unquote(source)
 
-    host = parsed_url.netloc.lower()
-    user_name, repo_name = _get_user_and_repo_from_path(parsed_url.path)
+    # Fast path: a plain URL on a known host is validated and split by a single regex match
+    git_url = _match_git_url(unquoted_source)
+    if git_url is None:
+        # Reuse the caller's parse result only if unquoting did not change the source
+        git_url = await _split_remote_source(unquoted_source, parsed_url if unquoted_source == source else None)
+    host, user_name, repo_name, remaining_parts = git_url
 
     _id = str(uuid.uuid4())
     slug = f"{user_name}-{repo_name}"
@@ -151,8 +134,6 @@ async def _parse_remote_repo(source: str) -> IngestionQuery:
         id=_id,
     )
 
-    remaining_parts = parsed_url.path.strip("/").split("/")[2:]
-
     if not remaining_parts:
         return parsed
 
@@ -183,6 +164,53 @@ async def _parse_remote_repo(source: str) -> IngestionQuery:
     return parsed
 
 
+async def _split_remote_source(
+    source: str,
+    parsed_url: Optional[ParseResult] = None,
+) -> Tuple[str, str, str, List[str]]:
+    """
+    Validate a repository URL or slug and split it into its host, user and repository names, and remaining parts.
+
+    If source is:
+      - A fully qualified URL (https://gitlab.com/...), parse & verify that domain
+      - A URL missing 'https://' (gitlab.com/...), add 'https://' and parse
+      - A 'slug' (like 'pandas-dev/pandas'), attempt known domains until we find one that exists.
+
+    Parameters
+    ----------
+    source : str
+        The unquoted URL or domain-less slug to split.
+    parsed_url : ParseResult, optional
+        The result of `urlparse(source)` if the caller already has it, by default None.
+
+    Returns
+    -------
+    Tuple[str, str, str, List[str]]
+        The lowercased host, user and repository names, and the remaining parts of the URL path.
+    """
+    if parsed_url is None:
+        parsed_url = urlparse(source)
+
+    if parsed_url.scheme:
+        _validate_url_scheme(parsed_url.scheme)
+        _validate_host(parsed_url.netloc.lower())
+
+    else:  # Will be of the form 'host/user/repo' or 'user/repo'
+        tmp_host = source.split("/")[0].lower()
+        if "." in tmp_host:
+            _validate_host(tmp_host)
+        else:
+            # No scheme, no domain => user typed "user/repo", so we'll guess the domain.
+            host = await try_domains_for_user_and_repo(*_get_user_and_repo_from_path(source))
+            source = f"{host}/{source}"
+
+        source = "https://" + source
+        parsed_url = urlparse(source)
+
+    user_name, repo_name, remaining_parts = _split_repo_path(parsed_url.path)
+    return parsed_url.netloc.lower(), user_name, repo_name, remaining_parts
+
+
 async def _configure_branch_and_subpath(remaining_parts: List[str], url: str) -> Optional[str]:
     """
     Configure the branch and subpath based on the remaining parts of the URL.
@@ -200,18 +228,20 @@ async def _configure_branch_and_subpath(remaining_parts: List[str], url: str) ->
     """
     try:
         # Fetch the list of branches from the remote repository
-        branches: List[str] = await fetch_remote_branch_list(url)
+        branches: FrozenSet[str] = frozenset(await fetch_remote_branch_list(url))
     except RuntimeError as exc:
         warnings.warn(f"Warning: Failed to fetch branch list: {exc}", RuntimeWarning)
         return remaining_parts.pop(0)
 
-    branch = []
-    while remaining_parts:
-        branch.append(remaining_parts.pop(0))
-        branch_name = "/".join(branch)
+    # Look up the longest leading run of parts that names a branch, with one set lookup per candidate.
+    # Git refs cannot be nested (`feature` and `feature/x` cannot both exist), so at most one candidate matches.
+    for i in range(len(remaining_parts), 0, -1):
+        branch_name = "/".join(remaining_parts[:i])
         if branch_name in branches:
+            del remaining_parts[:i]
             return branch_name
 
+    remaining_parts.clear()
     return None
 
 
@@ -220,7 +250,7 @@ def _parse_patterns(pattern: Union[str, Set[str]]) -> Set[str]:
     Parse and validate file/directory patterns for inclusion or exclusion.
 
     Takes either a single pattern string or set of pattern strings and processes them into a normalized list.
-    Patterns are split on commas and spaces, validated for allowed characters, and normalized.
+    Patterns are split on commas and whitespace, validated for allowed characters, and normalized.
 
     Parameters
     ----------
@@ -241,12 +271,10 @@ def _parse_patterns(pattern: Union[str, Set[str]]) -> Set[str]:
     """
     patterns = pattern if isinstance(pattern, set) else {pattern}
 
+    # Split on commas and whitespace; `str.split` without arguments also drops empty strings
     parsed_patterns: Set[str] = set()
     for p in patterns:
-        parsed_patterns = parsed_patterns.union(set(re.split(",| ", p)))
-
-    # Remove empty string if present
-    parsed_patterns = parsed_patterns - {""}
+        parsed_patterns.update(p.replace(",", " ").split())
 
     # Normalize Windows paths to Unix-style paths
     parsed_patterns = {p.replace("\\", "/") for p in parsed_patterns}
@@ -289,6 +317,10 @@ async def try_domains_for_user_and_repo(user_name: str, repo_name: str) -> str:
     """
     Attempt to find a valid repository host for the given user_name and repo_name.
 
+    All known hosts are probed concurrently, with a single HTTP client, and the results are walked in
+    `KNOWN_GIT_HOSTS` order, as if the hosts had been probed one after the other: the first host where the repository
+    exists wins, and a failed probe only matters if it comes before that host.
+
     Parameters
     ----------
     user_name : str
@@ -305,9 +337,15 @@ async def try_domains_for_user_and_repo(user_name: str, repo_name: str) -> str:
     ------
     ValueError
         If no valid repository host is found for the given user_name and repo_name.
+    result
+        If the probe of a host before the first matching one failed, e.g. because it returned an unexpected status
+        code.
     """
-    for domain in KNOWN_GIT_HOSTS:
-        candidate = f"https://{domain}/{user_name}/{repo_name}"
-        if await check_repo_exists(candidate):
+    urls = [f"https://{domain}/{user_name}/{repo_name}" for domain in KNOWN_GIT_HOSTS]
+    results = await check_repos_exist(urls, return_exceptions=True)
+    for domain, result in zip(KNOWN_GIT_HOSTS, results):
+        if isinstance(result, BaseException):
+            raise result
+        if result:
             return domain
     raise ValueError(f"Could not find a valid repository host for '{user_name}/{repo_name}'.")
@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import os
+import threading
 from dataclasses import dataclass, field
 from enum import Enum, auto
+from functools import cached_property
 from pathlib import Path
 
-from gitingest.utils.file_utils import get_preferred_encodings, is_text_file
+from gitingest.utils.file_utils import detect_text_encoding, get_preferred_encodings, read_text
 from gitingest.utils.notebook_utils import process_notebook
 
 SEPARATOR = "=" * 48  # Tiktoken, the tokenizer openai uses, counts 2 tokens if we have more than 48
+MMAP_THRESHOLD = 256 * 1024  # Files larger than this (in bytes) are read through a memory map
 
 
 class FileSystemNodeType(Enum):
@@ -22,12 +25,18 @@ class FileSystemNodeType(Enum):
 
 
 @dataclass
-class FileSystemStats:
+class FileSystemStats:  # pylint: disable=too-many-instance-attributes
     """Class for tracking statistics during file system traversal."""
 
-    visited: set[Path] = field(default_factory=set)
+    visited: set[str] = field(default_factory=set)  # Paths as plain strings, cheaper to hash and store than `Path`
     total_files: int = 0
     total_size: int = 0
+    max_files_reached: bool = False
+    max_total_size_reached: bool = False
+    skipped_too_deep: int = 0  # Directories deeper than the maximum depth
+    skipped_over_total_size: int = 0  # Files that would have exceeded the total size limit
+    skipped_unknown_type: int = 0  # Entries that are neither files, directories nor symlinks
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
 
 
 @dataclass
@@ -47,6 +56,14 @@ class FileSystemNode:  # pylint: disable=too-many-instance-attributes
     dir_count: int = 0
     depth: int = 0
     children: list[FileSystemNode] = field(default_factory=list)
+    skipped: bool = False  # The file is larger than the maximum file size, so its content is never read
+    symlink_target: str | None = None  # Name of the target of a symlink, read once when the symlink is found
+    _encoding: str | None = field(default=None, init=False, repr=False)  # Detected when the content is first read
+    posix_path_str: str = field(init=False, repr=False)  # `path_str` with forward slashes, as shown in the output
+
+    def __post_init__(self) -> None:
+        # Convert once here rather than each time the node is rendered; there is nothing to convert on POSIX
+        self.posix_path_str = self.path_str if os.sep == "/" else self.path_str.replace(os.sep, "/")
 
     def sort_children(self) -> None:
         """
@@ -92,19 +109,21 @@ class FileSystemNode:  # pylint: disable=too-many-instance-attributes
         """
         parts = [
             SEPARATOR,
-            f"{self.type.name}: {str(self.path_str).replace(os.sep, '/')}"
-            + (f" -> {self.path.readlink().name}" if self.type == FileSystemNodeType.SYMLINK else ""),
+            f"{self.type.name}: {self.posix_path_str}"
+            + (f" -> {self.symlink_target}" if self.type == FileSystemNodeType.SYMLINK else ""),
             SEPARATOR,
             f"{self.content}",
         ]
 
         return "\n".join(parts) + "\n\n"
 
-    @property
-    def content(self) -> str:  # pylint: disable=too-many-return-statements
+    @cached_property
+    def content(self) -> str:
         """
         Read the content of a file if it's text (or a notebook). Return an error message otherwise.
 
+        The file is read on first access only; the result is cached on the node.
+
         Returns
         -------
         str
@@ -118,11 +137,27 @@ class FileSystemNode:  # pylint: disable=too-many-instance-attributes
         if self.type == FileSystemNodeType.DIRECTORY:
             raise ValueError("Cannot read content of a directory node")
 
+        return self._read_content()
+
+    def _read_content(self) -> str:  # pylint: disable=too-many-return-statements
+        """
+        Read the content of a file or symlink node.
+
+        Returns
+        -------
+        str
+            The content of the file, or an error message if the file could not be read.
+        """
         if self.type == FileSystemNodeType.SYMLINK:
             return ""
 
-        if not is_text_file(self.path):
-            return "[Non-text file]"
+        if self.skipped:
+            return f"[File omitted: {self.size} bytes exceeds the maximum file size]"
+
+        if self._encoding is None:
+            self._encoding = detect_text_encoding(self.path)
+            if self._encoding is None:
+                return "[Non-text file]"
 
         if self.path.suffix == ".ipynb":
             try:
@@ -130,16 +165,17 @@ class FileSystemNode:  # pylint: disable=too-many-instance-attributes
             except Exception as exc:
                 return f"Error processing notebook: {exc}"
 
-        # Try multiple encodings
-        for encoding in get_preferred_encodings():
-            try:
-                with self.path.open(encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                continue
-            except UnicodeError:
-                continue
-            except OSError as exc:
-                return f"Error reading file: {exc}"
-
-        return "Error: Unable to decode file with available encodings"
+        # Try the detected encoding first, then the ones after it: those before it already failed on the first chunk
+        encodings = get_preferred_encodings()
+        try:
+            text = read_text(
+                self.path,
+                encodings[encodings.index(self._encoding) :],
+                use_mmap=self.size > MMAP_THRESHOLD,
+            )
+        except OSError as exc:
+            return f"Error reading file: {exc}"
+
+        if text is None:
+            return "Error: Unable to decode file with available encodings"
+        return text
@@ -2,9 +2,7 @@
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Set
-
-from pydantic import BaseModel, ConfigDict, Field
+from typing import AbstractSet, Optional, Set
 
 from gitingest.config import MAX_FILE_SIZE
 
@@ -29,6 +27,11 @@ class CloneConfig:
         The branch to clone (default is None).
     subpath : str
         The subpath to clone from the repository (default is "/").
+    blob : bool
+        Whether the subpath points to a single file (default is False).
+    include_patterns : Set[str], optional
+        Patterns of the files that will be ingested. When they all lie under known directories, only those
+        directories are checked out (default is None).
     """
 
     url: str
@@ -37,29 +40,60 @@ class CloneConfig:
     branch: Optional[str] = None
     subpath: str = "/"
     blob: bool = False
+    include_patterns: Optional[Set[str]] = None
 
 
-class IngestionQuery(BaseModel):  # pylint: disable=too-many-instance-attributes
+@dataclass
+class IngestionQuery:  # pylint: disable=too-many-instance-attributes
     """
-    Pydantic model to store the parsed details of the repository or file path.
+    Parsed details of the repository or file path to ingest.
+
+    The query is only ever built from values that were already parsed and validated, so it is a plain dataclass.
+
+    Attributes
+    ----------
+    local_path : Path
+        The local path of the repository or directory to ingest.
+    slug : str
+        A short name identifying the source.
+    id : str
+        A unique identifier of the query.
+    user_name : str, optional
+        The owner of the remote repository (default is None).
+    repo_name : str, optional
+        The name of the remote repository (default is None).
+    url : str, optional
+        The URL of the remote repository (default is None).
+    subpath : str
+        The subpath to ingest within the repository (default is "/").
+    type : str, optional
+        The type of the URL path, such as "tree" or "blob" (default is None).
+    branch : str, optional
+        The branch to ingest (default is None).
+    commit : str, optional
+        The commit to ingest (default is None).
+    max_file_size : int
+        The maximum size of a file to include its content, in bytes (default is `MAX_FILE_SIZE`).
+    ignore_patterns : AbstractSet[str], optional
+        Patterns of the paths to leave out (default is None).
+    include_patterns : Set[str], optional
+        Patterns of the paths to ingest (default is None).
     """
 
-    user_name: Optional[str] = None
-    repo_name: Optional[str] = None
     local_path: Path
-    url: Optional[str] = None
     slug: str
     id: str
+    user_name: Optional[str] = None
+    repo_name: Optional[str] = None
+    url: Optional[str] = None
     subpath: str = "/"
     type: Optional[str] = None
     branch: Optional[str] = None
     commit: Optional[str] = None
-    max_file_size: int = Field(default=MAX_FILE_SIZE)
-    ignore_patterns: Optional[Set[str]] = None
+    max_file_size: int = MAX_FILE_SIZE
+    ignore_patterns: Optional[AbstractSet[str]] = None
     include_patterns: Optional[Set[str]] = None
 
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-
     def extract_clone_config(self) -> CloneConfig:
         """
         Extract the relevant fields for the CloneConfig object.
@@ -84,4 +118,5 @@ class IngestionQuery(BaseModel):  # pylint: disable=too-many-instance-attributes
             branch=self.branch,
             subpath=self.subpath,
             blob=self.type == "blob",
+            include_patterns=self.include_patterns,
         )
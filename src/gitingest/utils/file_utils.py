@@ -1,36 +1,55 @@
 """Utility functions for working with files and directories."""
 
+import codecs
 import locale
+import mmap
+import os
 import platform
 from pathlib import Path
-from typing import List
+from typing import Final, Optional, Sequence, Tuple, Union
 
 try:
     locale.setlocale(locale.LC_ALL, "")
 except locale.Error:
     locale.setlocale(locale.LC_ALL, "C")
 
+# Encodings to try, in priority order: the platform's default encoding followed by common fallback encodings
+_PREFERRED_ENCODINGS: Final[Tuple[str, ...]] = (
+    locale.getpreferredencoding(),
+    "utf-8",
+    "utf-16",
+    "utf-16le",
+    "utf-8-sig",
+    "latin",
+    *(("cp1252", "iso-8859-1") if platform.system() == "Windows" else ()),
+)
 
-def get_preferred_encodings() -> List[str]:
+# Bytes that commonly appear in text: control characters used for formatting, printable ASCII and everything above
+# 0x7f (which may be part of a multi-byte or legacy 8-bit encoding)
+_TEXTCHARS: Final[bytes] = bytes({7, 8, 9, 10, 11, 12, 13, 27}) + bytes(range(0x20, 0x7F)) + bytes(range(0x80, 0x100))
+
+# A file whose first chunk contains more than this proportion of other bytes is considered binary
+_MAX_NON_TEXT_RATIO: Final[float] = 0.3
+
+
+def get_preferred_encodings() -> Tuple[str, ...]:
     """
-    Get list of encodings to try, prioritized for the current platform.
+    Get the encodings to try, prioritized for the current platform.
+
+    The encodings are determined once, when the module is imported.
 
     Returns
     -------
-    List[str]
-        List of encoding names to try in priority order, starting with the
+    Tuple[str, ...]
+        Encoding names to try in priority order, starting with the
         platform's default encoding followed by common fallback encodings.
     """
-    encodings = [locale.getpreferredencoding(), "utf-8", "utf-16", "utf-16le", "utf-8-sig", "latin"]
-    if platform.system() == "Windows":
-        encodings += ["cp1252", "iso-8859-1"]
-    return encodings
+    return _PREFERRED_ENCODINGS
 
 
 def is_text_file(path: Path) -> bool:
     """
-    Determine if the file is likely a text file by trying to decode a small chunk
-    with multiple encodings, and checking for common binary markers.
+    Determine if the file is likely a text file by inspecting its first kilobyte.
 
     Parameters
     ----------
@@ -42,33 +61,141 @@ def is_text_file(path: Path) -> bool:
     bool
         True if the file is likely textual; False if it appears to be binary.
     """
+    return detect_text_encoding(path) is not None
+
+
+def detect_text_encoding(path: Path) -> Optional[str]:
+    """
+    Detect the encoding of the file by inspecting its first kilobyte, if the file is likely a text file.
+
+    The chunk is rejected if it contains common binary markers or if too many of its bytes are not usually found in
+    text. Otherwise, the first preferred encoding that can decode it is returned. This only looks at the start of the
+    file, so the cost does not depend on the file size.
+
+    Parameters
+    ----------
+    path : Path
+        The path to the file to check.
+
+    Returns
+    -------
+    str, optional
+        The encoding to read the file with if it is likely textual; None if it appears to be binary.
+    """
 
     # Attempt to read a portion of the file in binary mode
     try:
         with path.open("rb") as f:
             chunk = f.read(1024)
     except OSError:
-        return False
+        return None
 
     # If file is empty, treat as text
     if not chunk:
-        return True
+        return get_preferred_encodings()[0]
 
     # Check obvious binary bytes
     if b"\x00" in chunk or b"\xff" in chunk:
-        return False
+        return None
 
-    # Attempt multiple encodings
-    for enc in get_preferred_encodings():
+    non_text = chunk.translate(None, _TEXTCHARS)
+    if len(non_text) > _MAX_NON_TEXT_RATIO * len(chunk):
+        return None
+
+    # Decode incrementally, as the chunk may end in the middle of a multi-byte character
+    for encoding in get_preferred_encodings():
         try:
-            with path.open(encoding=enc) as f:
-                f.read()
-                return True
-        except UnicodeDecodeError:
-            continue
+            codecs.getincrementaldecoder(encoding)().decode(chunk)
         except UnicodeError:
             continue
-        except OSError:
-            return False
+        return encoding
+
+    return None
+
+
+def prefetch_file(path: Path) -> None:
+    """
+    Ask the operating system to start reading a file into the page cache in the background.
+
+    This is only a hint: it returns immediately, does nothing on platforms without `posix_fadvise`, and ignores any
+    error, since the file will be read (and errors reported) later anyway.
+
+    Parameters
+    ----------
+    path : Path
+        The path to the file that is about to be read.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def read_text(path: Path, encodings: Sequence[str], use_mmap: bool = False) -> Optional[str]:
+    """
+    Read a text file once and decode it with the first of the given encodings that succeeds.
+
+    The raw bytes are read a single time and reused for each decoding attempt. Large files can be read through a
+    memory map, so that they are decoded straight from the mapped pages without an intermediate copy. Newlines are
+    translated as in text mode, so the result is the same as `path.open(encoding=encoding).read()`. An `OSError` from
+    opening, reading or mapping the file propagates to the caller.
+
+    Parameters
+    ----------
+    path : Path
+        The path to the file to read.
+    encodings : Sequence[str]
+        The encodings to try, in order.
+    use_mmap : bool
+        Whether to read the file through a memory map, by default False.
+
+    Returns
+    -------
+    str, optional
+        The content of the file, or None if none of the encodings can decode it.
+    """
+    with path.open("rb") as f:
+        # Empty files cannot be mapped
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = _decode(mm, encodings)
+        else:
+            text = _decode(f.read(), encodings)
+
+    if text is not None and "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
 
-    return False
+def _decode(data: Union[bytes, mmap.mmap], encodings: Sequence[str]) -> Optional[str]:
+    """
+    Decode data with the first of the given encodings that succeeds.
+
+    Parameters
+    ----------
+    data : Union[bytes, mmap.mmap]
+        The data to decode.
+    encodings : Sequence[str]
+        The encodings to try, in order.
+
+    Returns
+    -------
+    str, optional
+        The decoded text, or None if none of the encodings can decode the data.
+    """
+    for encoding in encodings:
+        try:
+            return str(data, encoding)
+        except UnicodeError:
+            continue
+    return None
@@ -1,17 +1,43 @@
 """Utility functions for interacting with Git repositories."""
 
 import asyncio
-from typing import List, Tuple
+import os
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+import httpx
 
-async def run_command(*args: str) -> Tuple[bytes, bytes]:
+REPO_EXISTS_TTL: float = 60.0  # Seconds for which a successful repository check is reused
+REPO_MISSING_TTL: float = 5.0  # Seconds for which a failed repository check is reused
+REPO_EXISTS_CACHE_SIZE: int = 512
+BRANCH_LIST_TTL: float = 60.0  # Seconds for which a fetched branch list is reused
+BRANCH_LIST_CACHE_SIZE: int = 512
+
+REPO_CHECK_TIMEOUT: float = 10.0  # Seconds allowed for each request of a repository check
+
+GIT_CLONE_REVISION_VERSION: Tuple[int, ...] = (2, 49)  # First Git version with `git clone --revision`
+
+_GIT_VERSION: Optional[Tuple[int, ...]] = None
+_repo_exists_cache: Dict[str, Tuple[float, bool]] = {}  # URL -> (time of the check, whether the repository exists)
+_branch_list_cache: Dict[str, Tuple[float, List[str]]] = {}  # URL -> (time of the fetch, branches)
+_branch_list_fetches: Dict[str, "asyncio.Future[List[str]]"] = {}  # URL -> fetch in progress
+
+
+async def run_command(*args: str, capture: bool = True) -> Tuple[bytes, bytes]:
     """
     Execute a shell command asynchronously and return (stdout, stderr) bytes.
 
+    Git is never allowed to prompt for credentials: a missing or private repository makes the command fail instead
+    of waiting for input.
+
     Parameters
     ----------
     *args : str
         The command and its arguments to execute.
+    capture : bool
+        Whether to capture the standard output, by default True. When False, the output is discarded by the
+        operating system instead of being read and buffered, and empty bytes are returned in its place.
 
     Returns
     -------
@@ -26,10 +52,12 @@ async def run_command(*args: str) -> Tuple[bytes, bytes]:
     # Execute the requested command
     proc = await asyncio.create_subprocess_exec(
         *args,
-        stdout=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL,
         stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
     )
     stdout, stderr = await proc.communicate()
+    stdout = stdout or b""
     if proc.returncode != 0:
         error_message = stderr.decode().strip()
         raise RuntimeError(f"Command failed: {' '.join(args)}\nError: {error_message}")
@@ -37,70 +65,232 @@ async def run_command(*args: str) -> Tuple[bytes, bytes]:
     return stdout, stderr
 
 
-async def ensure_git_installed() -> None:
+async def ensure_git_installed() -> Tuple[int, ...]:
     """
-    Ensure Git is installed and accessible on the system.
+    Ensure Git is installed and accessible on the system, and return its version.
+
+    The version is determined once, and reused by later calls.
+
+    Returns
+    -------
+    Tuple[int, ...]
+        The version of Git, e.g. `(2, 49, 0)`, or `(0,)` if it cannot be parsed.
 
     Raises
     ------
     RuntimeError
         If Git is not installed or not accessible.
     """
+    global _GIT_VERSION  # pylint: disable=global-statement
+
+    if _GIT_VERSION is not None:
+        return _GIT_VERSION
+
     try:
-        await run_command("git", "--version")
+        stdout, _ = await run_command("git", "--version")
     except RuntimeError as exc:
         raise RuntimeError("Git is not installed or not accessible. Please install Git first.") from exc
 
+    # The output looks like "git version 2.49.0", possibly followed by a platform suffix
+    match = re.search(r"\d+(?:\.\d+)*", stdout.decode())
+    _GIT_VERSION = tuple(map(int, match.group().split("."))) if match else (0,)
+    return _GIT_VERSION
+
 
 async def check_repo_exists(url: str) -> bool:
     """
     Check if a Git repository exists at the provided URL.
 
+    A repository that was found is remembered for `REPO_EXISTS_TTL` seconds, so repeated checks of the same URL do
+    not spawn a new request. A repository that was not found is only remembered for `REPO_MISSING_TTL` seconds, so
+    that a transient failure is retried soon.
+
+    The check is done by `check_repos_exist`, whose `RuntimeError` for an unexpected status code propagates.
+
     Parameters
     ----------
     url : str
         The URL of the Git repository to check.
     Returns
     -------
+    bool
+        True if the repository exists, False otherwise.
+    """
+    return (await check_repos_exist([url]))[0]
+
+
+async def check_repos_exist(urls: Sequence[str], return_exceptions: bool = False) -> List[Union[bool, BaseException]]:
+    """
+    Check if Git repositories exist at the provided URLs.
+
+    Results are cached as in `check_repo_exists`. The URLs without a cached result are checked together, by a single
+    HTTP client that requests their headers in parallel.
+
+    Parameters
+    ----------
+    urls : Sequence[str]
+        The URLs of the Git repositories to check.
+    return_exceptions : bool
+        Whether to return the error of a failed check in place of its result, by default False. When False, the
+        error of the first URL whose check failed is raised.
+
+    Returns
+    -------
+    List[Union[bool, BaseException]]
+        For each URL, in order, True if the repository exists, False otherwise, or the error of its check.
+
+    Raises
+    ------
+    exc
+        If the check of a URL failed, e.g. because its server returned an unexpected status code, and
+        `return_exceptions` is False.
+    """
+    now = time.monotonic()
+    results: Dict[str, Union[bool, BaseException]] = {}
+    for url in urls:
+        cached = _repo_exists_cache.get(url)
+        if cached is not None:
+            checked_at, exists = cached
+            if now - checked_at < (REPO_EXISTS_TTL if exists else REPO_MISSING_TTL):
+                results[url] = exists
+
+    unchecked = [url for url in dict.fromkeys(urls) if url not in results]
+    if unchecked:
+        results.update(await _check_repos_exist_uncached(unchecked))
+
+    for url in unchecked:
+        result = results[url]
+        if isinstance(result, BaseException):
+            continue
+        _repo_exists_cache.pop(url, None)
+        if len(_repo_exists_cache) >= REPO_EXISTS_CACHE_SIZE:
+            del _repo_exists_cache[next(iter(_repo_exists_cache))]  # Evict the oldest entry
+        _repo_exists_cache[url] = (now, result)
+
+    if not return_exceptions:
+        for url in urls:
+            exc = results[url]
+            if isinstance(exc, BaseException):
+                raise exc
+
+    return [results[url] for url in urls]
+
+
+async def _check_repos_exist_uncached(urls: List[str]) -> Dict[str, Union[bool, BaseException]]:
+    """
+    Check if Git repositories exist at the provided URLs by requesting their headers.
+
+    The requests are sent in parallel by a single HTTP client, so that the URLs on the same host share a connection.
+    A failed check does not stop the others.
+
+    Parameters
+    ----------
+    urls : List[str]
+        The URLs of the Git repositories to check.
+
+    Returns
+    -------
+    Dict[str, Union[bool, BaseException]]
+        For each URL, True if the repository exists, False otherwise, or the error of its check.
+    """
+    async with _new_http_client() as client:
+        results = await asyncio.gather(*(_check_repo_exists_with(client, url) for url in urls), return_exceptions=True)
+    return dict(zip(urls, results))
+
+
+async def _check_repo_exists_with(client: httpx.AsyncClient, url: str) -> bool:
+    """
+    Check if a Git repository exists at the provided URL, using the given HTTP client.
+
+    Parameters
+    ----------
+    client : httpx.AsyncClient
+        The HTTP client sending the request.
+    url : str
+        The URL of the Git repository to check.
+
+    Returns
+    -------
     bool
         True if the repository exists, False otherwise.
 
     Raises
     ------
     RuntimeError
-        If the curl command returns an unexpected status code.
+        If the server returns an unexpected status code.
     """
-    proc = await asyncio.create_subprocess_exec(
-        "curl",
-        "-I",
-        url,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    stdout, _ = await proc.communicate()
+    try:
+        response = await client.head(url)
+    except (httpx.InvalidURL, httpx.TransportError):
+        return False  # likely unreachable
 
-    if proc.returncode != 0:
-        return False  # likely unreachable or private
+    if response.status_code in (200, 301):
+        return True
+    if response.status_code in (302, 404):
+        return False
+    raise RuntimeError(f"Unexpected status code for {url}: {response.status_code}")
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    """
+    Create the HTTP client used to check whether repositories exist.
+
+    Redirects are not followed: a permanent redirect means that the repository was moved, while a temporary one
+    usually leads to a login page.
 
-    response = stdout.decode()
-    status_line = response.splitlines()[0].strip()
-    parts = status_line.split(" ")
-    if len(parts) >= 2:
-        status_code_str = parts[1]
-        if status_code_str in ("200", "301"):
-            return True
-        if status_code_str in ("302", "404"):
-            return False
-    raise RuntimeError(f"Unexpected status line: {status_line}")
+    Returns
+    -------
+    httpx.AsyncClient
+        The HTTP client.
+    """
+    return httpx.AsyncClient(follow_redirects=False, timeout=REPO_CHECK_TIMEOUT)
 
 
 async def fetch_remote_branch_list(url: str) -> List[str]:
     """
     Fetch the list of branches from a remote Git repository.
+
+    The list is reused for `BRANCH_LIST_TTL` seconds, and concurrent calls for the same URL share a single
+    `git ls-remote` run. At most `BRANCH_LIST_CACHE_SIZE` lists are kept, the oldest being evicted first.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the Git repository to fetch branches from.
+
+    Returns
+    -------
+    List[str]
+        A list of branch names available in the remote repository.
+    """
+    cached = _branch_list_cache.get(url)
+    if cached is not None and time.monotonic() - cached[0] < BRANCH_LIST_TTL:
+        return list(cached[1])
+
+    fetch = _branch_list_fetches.get(url)
+    if fetch is None:
+        fetch = asyncio.ensure_future(_fetch_remote_branch_list_uncached(url))
+        _branch_list_fetches[url] = fetch
+        fetch.add_done_callback(lambda _: _branch_list_fetches.pop(url, None))
+
+    # Shield the shared fetch, so that a cancelled caller does not cancel it for the others
+    branches = await asyncio.shield(fetch)
+    _branch_list_cache.pop(url, None)
+    if len(_branch_list_cache) >= BRANCH_LIST_CACHE_SIZE:
+        del _branch_list_cache[next(iter(_branch_list_cache))]  # Evict the oldest entry
+    _branch_list_cache[url] = (time.monotonic(), branches)
+    return list(branches)
+
+
+async def _fetch_remote_branch_list_uncached(url: str) -> List[str]:
+    """
+    Fetch the list of branches from a remote Git repository with `git ls-remote`.
+
     Parameters
     ----------
     url : str
         The URL of the Git repository to fetch branches from.
+
     Returns
     -------
     List[str]
@@ -109,10 +299,8 @@ async def fetch_remote_branch_list(url: str) -> List[str]:
     fetch_branches_command = ["git", "ls-remote", "--heads", url]
     await ensure_git_installed()
     stdout, _ = await run_command(*fetch_branches_command)
-    stdout_decoded = stdout.decode()
 
+    # `partition` returns an empty tail for lines without a branch ref, so each line is scanned only once
     return [
-        line.split("refs/heads/", 1)[1]
-        for line in stdout_decoded.splitlines()
-        if line.strip() and "refs/heads/" in line
+        branch.decode() for branch in (line.partition(b"refs/heads/")[2] for line in stdout.splitlines()) if branch
     ]
@@ -1,48 +1,152 @@
 """Utility functions for the ingestion process."""
 
-from fnmatch import fnmatch
-from pathlib import Path
-from typing import Set
+import os
+import re
+from fnmatch import translate
+from functools import lru_cache
+from typing import FrozenSet, NamedTuple, Optional, Pattern, Tuple
 
+WILDCARD_CHARS = "*?["  # Characters that start a wildcard in a glob pattern
 
-def _should_include(path: Path, base_path: Path, include_patterns: Set[str]) -> bool:
+
+class _PatternMatcher(NamedTuple):
+    """
+    A set of glob patterns compiled for matching.
+
+    Patterns of the form `*<literal>`, such as `*.py`, match exactly the paths ending with the literal. They are kept
+    as plain suffixes and checked with `str.endswith`, which is much cheaper than a regex; all other patterns are
+    combined into a single regular expression.
+    """
+
+    suffixes: Tuple[str, ...]
+    regex: Optional[Pattern[str]]
+
+    def match(self, path: str) -> bool:
+        """
+        Check whether a path matches any of the patterns.
+
+        Parameters
+        ----------
+        path : str
+            The path to check, already normalized with `os.path.normcase`.
+
+        Returns
+        -------
+        bool
+            `True` if the path matches any of the patterns, `False` otherwise.
+        """
+        return path.endswith(self.suffixes) or (self.regex is not None and self.regex.match(path) is not None)
+
+
+@lru_cache(maxsize=32)
+def _compile_patterns(patterns: FrozenSet[str]) -> Optional[_PatternMatcher]:
+    """
+    Compile a set of glob patterns for matching.
+
+    Suffix patterns (`*` followed by a literal) become plain suffixes. Every other pattern is translated with
+    `fnmatch.translate`, and the translations are joined into one regular expression. Matching a path is thus
+    equivalent to calling `fnmatch` with every pattern in turn, but takes at most one `endswith` call and one regex
+    match.
+
+    Parameters
+    ----------
+    patterns : FrozenSet[str]
+        The glob patterns to compile. Empty patterns are ignored.
+
+    Returns
+    -------
+    _PatternMatcher, optional
+        The compiled patterns, or `None` if there is no non-empty pattern.
+    """
+    suffixes = []
+    translated = []
+    for pattern in sorted(patterns):
+        if not pattern:
+            continue
+        pattern = os.path.normcase(pattern)
+        if pattern.startswith("*") and not any(char in pattern[1:] for char in WILDCARD_CHARS):
+            suffixes.append(pattern[1:])
+        else:
+            translated.append(translate(pattern))
+
+    if not suffixes and not translated:
+        return None
+    return _PatternMatcher(tuple(suffixes), re.compile("|".join(translated)) if translated else None)
+
+
+@lru_cache(maxsize=32)
+def _literal_prefixes(patterns: FrozenSet[str]) -> Tuple[str, ...]:
+    """
+    Return the literal prefix of each glob pattern, i.e. everything before its first wildcard character.
+
+    Any path matched by a pattern starts with the pattern's literal prefix, which makes the prefixes a cheap way to
+    tell whether a directory can contain a match at all.
+
+    Parameters
+    ----------
+    patterns : FrozenSet[str]
+        The glob patterns to inspect.
+
+    Returns
+    -------
+    Tuple[str, ...]
+        The literal prefixes of the non-empty patterns.
+    """
+    prefixes = []
+    for pattern in patterns:
+        if not pattern:
+            continue
+        end = min((i for i in map(pattern.find, WILDCARD_CHARS) if i != -1), default=len(pattern))
+        prefixes.append(os.path.normcase(pattern[:end]))
+    return tuple(prefixes)
+
+
+def _should_include(
+    rel_path: str,
+    is_dir: bool,
+    include_matcher: Optional[_PatternMatcher],
+    include_prefixes: Tuple[str, ...] = (),
+) -> bool:
     """
     Determine if the given file or directory path matches any of the include patterns.
 
     This function checks whether the relative path of a file or directory matches any of the specified patterns. If a
     match is found, it returns `True`, indicating that the file or directory should be included in further processing.
 
+    A directory is also included if one of the patterns could match a path below it, judged by comparing the
+    directory path with the literal prefix of each pattern. Directories that no pattern can reach are skipped
+    without being listed.
+
     Parameters
     ----------
-    path : Path
-        The absolute path of the file or directory to check.
-    base_path : Path
-        The base directory from which the relative path is calculated.
-    include_patterns : Set[str]
-        A set of patterns to check against the relative path.
+    rel_path : str
+        The path of the file or directory, relative to the directory being ingested.
+    is_dir : bool
+        Whether the path is a directory.
+    include_matcher : _PatternMatcher, optional
+        The include patterns, compiled with `_compile_patterns`.
+    include_prefixes : Tuple[str, ...]
+        The literal prefixes of the include patterns, as returned by `_literal_prefixes`, by default ().
 
     Returns
     -------
     bool
         `True` if the path matches any of the include patterns, `False` otherwise.
     """
-    try:
-        rel_path = path.relative_to(base_path)
-    except ValueError:
-        # If path is not under base_path at all
+    if include_matcher is None:
         return False
 
-    rel_str = str(rel_path)
-    if path.is_dir():
-        rel_str += "/"
+    if not is_dir:
+        return include_matcher.match(os.path.normcase(rel_path))
 
-    for pattern in include_patterns:
-        if fnmatch(rel_str, pattern):
-            return True
-    return False
+    dir_path = os.path.normcase(rel_path + "/")
+    if include_matcher.match(dir_path):
+        return True
 
+    return any(prefix.startswith(dir_path) or dir_path.startswith(prefix) for prefix in include_prefixes)
 
-def _should_exclude(path: Path, base_path: Path, ignore_patterns: Set[str]) -> bool:
+
+def _should_exclude(rel_path: str, is_dir: bool, ignore_matcher: Optional[_PatternMatcher]) -> bool:
     """
     Determine if the given file or directory path matches any of the ignore patterns.
 
@@ -50,28 +154,28 @@ def _should_exclude(path: Path, base_path: Path, ignore_patterns: Set[str]) -> b
     any of the specified ignore patterns. If a match is found, it returns `True`, indicating
     that the file or directory should be excluded from further processing.
 
+    Directories are matched both with and without a trailing slash, so that a pattern such as `build/` (normalized to
+    `build/*`) prunes the whole directory before it is listed.
+
     Parameters
     ----------
-    path : Path
-        The absolute path of the file or directory to check.
-    base_path : Path
-        The base directory from which the relative path is calculated.
-    ignore_patterns : Set[str]
-        A set of patterns to check against the relative path.
+    rel_path : str
+        The path of the file or directory, relative to the directory being ingested.
+    is_dir : bool
+        Whether the path is a directory.
+    ignore_matcher : _PatternMatcher, optional
+        The ignore patterns, compiled with `_compile_patterns`.
 
     Returns
     -------
     bool
         `True` if the path matches any of the ignore patterns, `False` otherwise.
     """
-    try:
-        rel_path = path.relative_to(base_path)
-    except ValueError:
-        # If path is not under base_path at all
+    if ignore_matcher is None:
+        return False
+
+    rel_path = os.path.normcase(rel_path)
+    if ignore_matcher.match(rel_path):
         return True
 
-    rel_str = str(rel_path)
-    for pattern in ignore_patterns:
-        if pattern and fnmatch(rel_str, pattern):
-            return True
-    return False
+    return is_dir and ignore_matcher.match(rel_path + os.path.normcase("/"))
@@ -55,6 +55,8 @@ def process_notebook(file: Path, include_output: bool = True) -> str:
     else:
         cells = notebook["cells"]
 
+    _drop_unused_mime_data(cells)
+
     result = ["# Jupyter notebook converted to Python script."]
 
     for cell in cells:
@@ -65,6 +67,25 @@ def process_notebook(file: Path, include_output: bool = True) -> str:
     return "\n\n".join(result) + "\n"
 
 
+def _drop_unused_mime_data(cells: List[Dict[str, Any]]) -> None:
+    """
+    Drop the MIME data of cell outputs that is never used, in place.
+
+    Only the `text/plain` representation of cell outputs ends up in the script, but notebooks often embed large
+    images or HTML next to it. Dropping those entries lets them be freed before the script is built.
+
+    Parameters
+    ----------
+    cells : List[Dict[str, Any]]
+        The cells of the notebook.
+    """
+    for cell in cells:
+        for output in cell.get("outputs") or ():
+            data = output.get("data")
+            if data:
+                output["data"] = {key: value for key, value in data.items() if key == "text/plain"}
+
+
 def _process_cell(cell: Dict[str, Any], include_output: bool) -> Optional[str]:
     """
     Process a Jupyter notebook cell and return the cell content as a string.
@@ -106,17 +127,15 @@ def _process_cell(cell: Dict[str, Any], include_output: bool) -> Optional[str]:
     outputs = cell.get("outputs")
     if include_output and outputs:
 
-        # Include cell outputs as comments
-        output_lines = []
+        # Include cell outputs as comments, one line each, and join all the pieces once
+        pieces = [cell_str, "\n# Output:"]
 
         for output in outputs:
-            output_lines += _extract_output(output)
-
-        for output_line in output_lines:
-            if not output_line.endswith("\n"):
-                output_line += "\n"
+            for output_line in _extract_output(output):
+                pieces.append("\n#   ")
+                pieces.append(output_line[:-1] if output_line.endswith("\n") else output_line)
 
-        cell_str += "\n# Output:\n#   " + "\n#   ".join(output_lines)
+        cell_str = "".join(pieces)
 
     return cell_str
 
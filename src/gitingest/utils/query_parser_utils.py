@@ -1,20 +1,42 @@
 """Utility functions for parsing and validating query parameters."""
 
 import os
+import re
 import string
-from typing import List, Set, Tuple
+from typing import FrozenSet, List, Optional, Tuple
 
-HEX_DIGITS: Set[str] = set(string.hexdigits)
+_SEP = os.sep  # Bound once, so that normalizing a pattern does not look up `os.sep` each time
 
+HEX_DIGITS: FrozenSet[str] = frozenset(string.hexdigits)
 
-KNOWN_GIT_HOSTS: List[str] = [
+# `\w` matches exactly the characters for which `str.isalnum()` is true, plus the underscore
+_VALID_PATTERN_RE = re.compile(r"[\w\-./+*@]*")
+
+
+# Known hosts, in the order in which they are tried for a domain-less slug
+KNOWN_GIT_HOSTS: Tuple[str, ...] = (
     "github.com",
     "gitlab.com",
     "bitbucket.org",
     "gitea.com",
     "codeberg.org",
     "gist.github.com",
-]
+)
+
+# The same hosts, for constant-time membership tests
+_KNOWN_GIT_HOSTS_SET: FrozenSet[str] = frozenset(KNOWN_GIT_HOSTS)
+
+# Finds any known host in a string with a single scan, instead of one substring search per host
+_KNOWN_GIT_HOSTS_RE = re.compile("|".join(re.escape(host) for host in KNOWN_GIT_HOSTS))
+
+# Matches a plain URL of a repository on a known host: scheme, host, user and repository names, then the rest of the
+# path. URLs with a port, credentials, an empty path segment, path parameters or whitespace (which `urlparse` strips)
+# do not match; they are left to `urlparse`.
+_GIT_URL_RE = re.compile(
+    r"https?://(" + "|".join(re.escape(host) for host in KNOWN_GIT_HOSTS) + r")"
+    r"/([^/?#;\s]+)/([^/?#;\s]+)(?:/([^?#;\s]*))?(?:[?#].*)?",
+    re.IGNORECASE | re.DOTALL,
+)
 
 
 def _is_valid_git_commit_hash(commit: str) -> bool:
@@ -34,7 +56,7 @@ def _is_valid_git_commit_hash(commit: str) -> bool:
     bool
         True if the string is a valid 40-character Git commit hash, otherwise False.
     """
-    return len(commit) == 40 and all(c in HEX_DIGITS for c in commit)
+    return len(commit) == 40 and HEX_DIGITS.issuperset(commit)
 
 
 def _is_valid_pattern(pattern: str) -> bool:
@@ -55,7 +77,7 @@ def _is_valid_pattern(pattern: str) -> bool:
     bool
         True if the pattern is valid, otherwise False.
     """
-    return all(c.isalnum() or c in "-_./+*@" for c in pattern)
+    return _VALID_PATTERN_RE.fullmatch(pattern) is not None
 
 
 def _validate_host(host: str) -> None:
@@ -72,7 +94,7 @@ def _validate_host(host: str) -> None:
     ValueError
         If the host is not a known Git host.
     """
-    if host not in KNOWN_GIT_HOSTS:
+    if host not in _KNOWN_GIT_HOSTS_SET:
         raise ValueError(f"Unknown domain '{host}' in URL")
 
 
@@ -94,6 +116,33 @@ def _validate_url_scheme(scheme: str) -> None:
         raise ValueError(f"Invalid URL scheme '{scheme}' in URL")
 
 
+def _match_git_url(url: str) -> Optional[Tuple[str, str, str, List[str]]]:
+    """
+    Validate and split a plain URL of a repository on a known host, with a single regex match.
+
+    This gives the same result as parsing the URL with `urlparse`, validating its scheme and host, and splitting its
+    path with `_split_repo_path`, for the URLs it accepts.
+
+    Parameters
+    ----------
+    url : str
+        The URL to match, such as `https://github.com/user/repo/tree/main/src`.
+
+    Returns
+    -------
+    Tuple[str, str, str, List[str]], optional
+        The lowercased host, user and repository names, and the remaining parts of the path, with their case
+        preserved; or None if the URL is not a plain URL on a known host.
+    """
+    match = _GIT_URL_RE.fullmatch(url)
+    if match is None:
+        return None
+
+    host, user_name, repo_name, rest = match.groups()
+    rest = rest.rstrip("/") if rest else ""
+    return host.lower(), user_name.lower(), repo_name.lower(), rest.split("/") if rest else []
+
+
 def _get_user_and_repo_from_path(path: str) -> Tuple[str, str]:
     """
     Extract the user and repository names from a given path.
@@ -113,10 +162,38 @@ def _get_user_and_repo_from_path(path: str) -> Tuple[str, str]:
     ValueError
         If the path does not contain at least two parts.
     """
-    path_parts = path.lower().strip("/").split("/")
+    # Only the first two parts are needed: leave the rest of the path unsplit
+    path_parts = path.strip("/").split("/", 2)
+    if len(path_parts) < 2:
+        raise ValueError(f"Invalid repository URL '{path}'")
+    return path_parts[0].lower(), path_parts[1].lower()
+
+
+def _split_repo_path(path: str) -> Tuple[str, str, List[str]]:
+    """
+    Split a repository URL path into the user name, the repository name and the remaining parts.
+
+    The path is split only once, so callers needing both the names and the rest of the path do not split it again.
+
+    Parameters
+    ----------
+    path : str
+        The path to split, such as `/user/repo/tree/main/src`.
+
+    Returns
+    -------
+    Tuple[str, str, List[str]]
+        The lowercased user and repository names, and the remaining parts of the path, with their case preserved.
+
+    Raises
+    ------
+    ValueError
+        If the path does not contain at least two parts.
+    """
+    path_parts = path.strip("/").split("/")
     if len(path_parts) < 2:
         raise ValueError(f"Invalid repository URL '{path}'")
-    return path_parts[0], path_parts[1]
+    return path_parts[0].lower(), path_parts[1].lower(), path_parts[2:]
 
 
 def _normalize_pattern(pattern: str) -> str:
@@ -136,7 +213,7 @@ def _normalize_pattern(pattern: str) -> str:
     str
         The normalized pattern.
     """
-    pattern = pattern.lstrip(os.sep)
-    if pattern.endswith(os.sep):
+    pattern = pattern.lstrip(_SEP)
+    if pattern.endswith(_SEP):
         pattern += "*"
     return pattern
@@ -2,6 +2,7 @@
 
 import asyncio
 import functools
+import sys
 from typing import Any, Awaitable, Callable, TypeVar
 
 from gitingest.utils.exceptions import AsyncTimeoutError
@@ -34,6 +35,10 @@ def async_timeout(seconds) -> Callable[[Callable[..., Awaitable[T]]], Callable[.
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
             try:
+                if sys.version_info >= (3, 11):
+                    # Runs the coroutine in the current task, instead of wrapping it in a new one like `wait_for`
+                    async with asyncio.timeout(seconds):
+                        return await func(*args, **kwargs)
                 return await asyncio.wait_for(func(*args, **kwargs), timeout=seconds)
             except asyncio.TimeoutError as exc:
                 raise AsyncTimeoutError(f"Operation timed out after {seconds} seconds") from exc
@@ -2,11 +2,10 @@
 
 import os
 from pathlib import Path
-from typing import Dict
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from slowapi.errors import RateLimitExceeded
 from starlette.middleware.trustedhost import TrustedHostMiddleware
@@ -43,18 +42,21 @@ else:
 # Add middleware to enforce allowed hosts
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=allowed_hosts)
 
+# The health check body never changes, so it is encoded once instead of on every probe
+_HEALTH_BODY = b'{"status":"healthy"}'
+
 
 @app.get("/health")
-async def health_check() -> Dict[str, str]:
+async def health_check() -> Response:
     """
     Health check endpoint to verify that the server is running.
 
     Returns
     -------
-    Dict[str, str]
+    Response
         A JSON object with a "status" key indicating the server's health status.
     """
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.head("/")
@@ -99,9 +101,9 @@ async def robots() -> FileResponse:
     Returns
     -------
     FileResponse
-        The `robots.txt` file located in the static directory.
+        The `robots.txt` file located in the static directory, cacheable by clients for a day.
     """
-    return FileResponse("static/robots.txt")
+    return FileResponse("static/robots.txt", headers={"Cache-Control": "public, max-age=86400"})
 
 
 # Include routers for modular endpoints
@@ -1,5 +1,7 @@
 """Process a query by parsing input, cloning a repository, and generating a summary."""
 
+import asyncio
+import logging
 from functools import partial
 
 from fastapi import Request
@@ -11,6 +13,17 @@ from gitingest.query_parsing import IngestionQuery, parse_query
 from server.server_config import EXAMPLE_REPOS, MAX_DISPLAY_SIZE, templates
 from server.server_utils import Colors, log_slider_to_size
 
+logger = logging.getLogger(__name__)
+
+_INFO_PREFIX = f"{Colors.GREEN}INFO{Colors.END}: {Colors.GREEN}<-  {Colors.END}"
+_WARN_PREFIX = f"{Colors.BROWN}WARN{Colors.END}: {Colors.RED}<-  {Colors.END}"
+
+# Templates for the query details, with the color codes filled in once at import time
+_URL_FMT = f"{Colors.WHITE}{{:<20}}{Colors.END}"
+_SIZE_FMT = f" | {Colors.YELLOW}Size: {{}}kb{Colors.END}"
+_INCLUDE_FMT = f" | {Colors.YELLOW}Include {{}}{Colors.END}"
+_EXCLUDE_FMT = f" | {Colors.YELLOW}Exclude {{}}{Colors.END}"
+
 
 async def process_query(
     request: Request,
@@ -87,15 +100,15 @@ async def process_query(
         clone_config = query.extract_clone_config()
         await clone_repo(clone_config)
         summary, tree, content = ingest_query(query)
-        with open(f"{clone_config.local_path}.txt", "w", encoding="utf-8") as f:
-            f.write(tree + "\n" + content)
+        # Write the digest in a worker thread, so that other requests are served in the meantime
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _write_digest, f"{clone_config.local_path}.txt", tree, content)
     except Exception as exc:
         # hack to print error message when query is not defined
         if "query" in locals() and query is not None and isinstance(query, dict):
-            _print_error(query["url"], exc, max_file_size, pattern_type, pattern)
+            _log_error(query["url"], exc, max_file_size, pattern_type, pattern)
         else:
-            print(f"{Colors.BROWN}WARN{Colors.END}: {Colors.RED}<-  {Colors.END}", end="")
-            print(f"{Colors.RED}{exc}{Colors.END}")
+            logger.warning("%s%s%s%s", _WARN_PREFIX, Colors.RED, exc, Colors.END)
 
         context["error_message"] = f"Error: {exc}"
         if "405" in str(exc):
@@ -110,7 +123,7 @@ async def process_query(
             "download full ingest to see more)\n" + content[:MAX_DISPLAY_SIZE]
         )
 
-    _print_success(
+    _log_success(
         url=query.url,
         max_file_size=max_file_size,
         pattern_type=pattern_type,
@@ -131,10 +144,29 @@ async def process_query(
     return template_response(context=context)
 
 
-def _print_query(url: str, max_file_size: int, pattern_type: str, pattern: str) -> None:
+def _write_digest(path: str, tree: str, content: str) -> None:
+    """
+    Write the digest of a query to a file, for it to be downloaded later.
+
+    The tree and the content are written one after the other, rather than concatenated into another large string.
+
+    Parameters
+    ----------
+    path : str
+        The path of the digest file.
+    tree : str
+        The directory structure of the ingested repository.
+    content : str
+        The content of the ingested files.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines((tree, "\n", content))
+
+
+def _format_query(url: str, max_file_size: int, pattern_type: str, pattern: str) -> str:
     """
-    Print a formatted summary of the query details, including the URL, file size,
-    and pattern information, for easier debugging or logging.
+    Format a summary of the query details, including the URL, file size, and pattern information, for easier
+    debugging or logging.
 
     Parameters
     ----------
@@ -146,19 +178,25 @@ def _print_query(url: str, max_file_size: int, pattern_type: str, pattern: str)
         Specifies the type of pattern to use, either "include" or "exclude".
     pattern : str
         The actual pattern string to include or exclude in the query.
+
+    Returns
+    -------
+    str
+        The formatted query details.
     """
-    print(f"{Colors.WHITE}{url:<20}{Colors.END}", end="")
+    parts = [_URL_FMT.format(url)]
     if int(max_file_size / 1024) != 50:
-        print(f" | {Colors.YELLOW}Size: {int(max_file_size/1024)}kb{Colors.END}", end="")
+        parts.append(_SIZE_FMT.format(int(max_file_size / 1024)))
     if pattern_type == "include" and pattern != "":
-        print(f" | {Colors.YELLOW}Include {pattern}{Colors.END}", end="")
+        parts.append(_INCLUDE_FMT.format(pattern))
     elif pattern_type == "exclude" and pattern != "":
-        print(f" | {Colors.YELLOW}Exclude {pattern}{Colors.END}", end="")
+        parts.append(_EXCLUDE_FMT.format(pattern))
+    return "".join(parts)
 
 
-def _print_error(url: str, e: Exception, max_file_size: int, pattern_type: str, pattern: str) -> None:
+def _log_error(url: str, e: Exception, max_file_size: int, pattern_type: str, pattern: str) -> None:
     """
-    Print a formatted error message including the URL, file size, pattern details, and the exception encountered,
+    Log a formatted error message including the URL, file size, pattern details, and the exception encountered,
     for debugging or logging purposes.
 
     Parameters
@@ -174,14 +212,13 @@ def _print_error(url: str, e: Exception, max_file_size: int, pattern_type: str,
     pattern : str
         The actual pattern string to include or exclude in the query.
     """
-    print(f"{Colors.BROWN}WARN{Colors.END}: {Colors.RED}<-  {Colors.END}", end="")
-    _print_query(url, max_file_size, pattern_type, pattern)
-    print(f" | {Colors.RED}{e}{Colors.END}")
+    query = _format_query(url, max_file_size, pattern_type, pattern)
+    logger.warning("%s%s | %s%s%s", _WARN_PREFIX, query, Colors.RED, e, Colors.END)
 
 
-def _print_success(url: str, max_file_size: int, pattern_type: str, pattern: str, summary: str) -> None:
+def _log_success(url: str, max_file_size: int, pattern_type: str, pattern: str, summary: str) -> None:
     """
-    Print a formatted success message, including the URL, file size, pattern details, and a summary with estimated
+    Log a formatted success message, including the URL, file size, pattern details, and a summary with estimated
     tokens, for debugging or logging purposes.
 
     Parameters
@@ -197,7 +234,10 @@ def _print_success(url: str, max_file_size: int, pattern_type: str, pattern: str
     summary : str
         A summary of the query result, including details like estimated tokens.
     """
-    estimated_tokens = summary[summary.index("Estimated tokens:") + len("Estimated ") :]
-    print(f"{Colors.GREEN}INFO{Colors.END}: {Colors.GREEN}<-  {Colors.END}", end="")
-    _print_query(url, max_file_size, pattern_type, pattern)
-    print(f" | {Colors.PURPLE}{estimated_tokens}{Colors.END}")
+    query = _format_query(url, max_file_size, pattern_type, pattern)
+    _, marker, estimated_tokens = summary.partition("Estimated tokens:")
+    if not marker:
+        # The token count is left out of the summary when it cannot be estimated
+        logger.info("%s%s", _INFO_PREFIX, query)
+        return
+    logger.info("%s%s | %stokens:%s%s", _INFO_PREFIX, query, Colors.PURPLE, estimated_tokens, Colors.END)
@@ -1,7 +1,7 @@
 """This module contains the FastAPI router for downloading a digest file."""
 
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import FileResponse
 
 from gitingest.config import TMP_BASE_PATH
 
@@ -9,12 +9,12 @@ router = APIRouter()
 
 
 @router.get("/download/{digest_id}")
-async def download_ingest(digest_id: str) -> Response:
+async def download_ingest(digest_id: str) -> FileResponse:
     """
     Download a .txt file associated with a given digest ID.
 
     This function searches for a `.txt` file in a directory corresponding to the provided
-    digest ID. If a file is found, it is read and returned as a downloadable attachment.
+    digest ID. If a file is found, it is streamed back as a downloadable attachment.
     If no `.txt` file is found, an error is raised.
 
     Parameters
@@ -25,8 +25,8 @@ async def download_ingest(digest_id: str) -> Response:
 
     Returns
     -------
-    Response
-        A FastAPI Response object containing the content of the found `.txt` file. The file is
+    FileResponse
+        A FastAPI FileResponse object streaming the content of the found `.txt` file. The file is
         sent with the appropriate media type (`text/plain`) and the correct `Content-Disposition`
         header to prompt a file download.
 
@@ -37,25 +37,10 @@ async def download_ingest(digest_id: str) -> Response:
     """
     directory = TMP_BASE_PATH / digest_id
 
-    try:
-        if not directory.exists():
-            raise FileNotFoundError("Directory not found")
+    # Find the first .txt file in the directory; there is none if the directory does not exist
+    first_file = next(directory.glob("*.txt"), None)
+    if first_file is None:
+        raise HTTPException(status_code=404, detail="Digest not found")
 
-        txt_files = [f for f in directory.iterdir() if f.suffix == ".txt"]
-        if not txt_files:
-            raise FileNotFoundError("No .txt file found")
-
-    except FileNotFoundError as exc:
-        raise HTTPException(status_code=404, detail="Digest not found") from exc
-
-    # Find the first .txt file in the directory
-    first_file = txt_files[0]
-
-    with first_file.open(encoding="utf-8") as f:
-        content = f.read()
-
-    return Response(
-        content=content,
-        media_type="text/plain",
-        headers={"Content-Disposition": f"attachment; filename={first_file.name}"},
-    )
+    # Stream the file rather than reading it into memory; `filename` makes it a downloadable attachment
+    return FileResponse(path=first_file, media_type="text/plain", filename=first_file.name)
@@ -1,11 +1,18 @@
 """Utility functions for the server."""
 
 import asyncio
+import logging
 import math
+import os
+import queue
 import shutil
+import sys
 import time
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import List, Optional
 
 from fastapi import FastAPI, Request
 from fastapi.responses import Response
@@ -19,6 +26,16 @@ from server.server_config import DELETE_REPO_AFTER
 # Initialize a rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+# Server log records are written to stdout, through a queue and a listener thread while the application runs
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler = QueueHandler(_log_queue)
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(logging.Formatter("%(message)s"))
+_server_logger = logging.getLogger("server")
+_server_logger.setLevel(logging.INFO)
+_server_logger.addHandler(_console_handler)
+_server_logger.propagate = False
+
 
 async def rate_limit_exception_handler(request: Request, exc: Exception) -> Response:
     """
@@ -63,6 +80,7 @@ async def lifespan(_: FastAPI):
     None
         Yields control back to the FastAPI application while the background task runs.
     """
+    log_listener = _start_log_listener()
     task = asyncio.create_task(_remove_old_repositories())
 
     yield
@@ -72,6 +90,40 @@ async def lifespan(_: FastAPI):
         await task
     except asyncio.CancelledError:
         pass
+    _stop_log_listener(log_listener)
+
+
+def _start_log_listener() -> QueueListener:
+    """
+    Start a listener thread that writes the queued server log records to stdout.
+
+    Once the listener runs, the server logger puts its records on the queue instead of writing them itself, so
+    writing to the console never blocks the event loop.
+
+    Returns
+    -------
+    QueueListener
+        The started listener, to be stopped on shutdown.
+    """
+    listener = QueueListener(_log_queue, _console_handler)
+    listener.start()
+    _server_logger.removeHandler(_console_handler)
+    _server_logger.addHandler(_queue_handler)
+    return listener
+
+
+def _stop_log_listener(listener: QueueListener) -> None:
+    """
+    Write the server log records directly to stdout again and stop the listener once the queue is drained.
+
+    Parameters
+    ----------
+    listener : QueueListener
+        The listener started by `_start_log_listener`.
+    """
+    _server_logger.removeHandler(_queue_handler)
+    _server_logger.addHandler(_console_handler)
+    listener.stop()
 
 
 async def _remove_old_repositories():
@@ -83,7 +135,7 @@ async def _remove_old_repositories():
     This task:
     - Scans the TMP_BASE_PATH directory every 60 seconds
     - Removes directories older than DELETE_REPO_AFTER seconds
-    - Before deletion, logs repository URLs to history.txt if a matching .txt file exists
+    - Logs the URLs of the removed repositories to history.txt, when a matching .txt file exists
     - Handles errors gracefully if deletion fails
 
     The repository URL is extracted from the first .txt file in each directory,
@@ -97,12 +149,22 @@ async def _remove_old_repositories():
 
             current_time = time.time()
 
-            for folder in TMP_BASE_PATH.iterdir():
+            # Drain the listing first: folders are deleted while processing them
+            with os.scandir(TMP_BASE_PATH) as it:
+                entries = list(it)
+
+            repo_urls = []
+            for entry in entries:
                 # Skip if folder is not old enough
-                if current_time - folder.stat().st_ctime <= DELETE_REPO_AFTER:
+                if current_time - entry.stat().st_ctime <= DELETE_REPO_AFTER:
                     continue
 
-                await _process_folder(folder)
+                repo_url = await _process_folder(Path(entry.path))
+                if repo_url is not None:
+                    repo_urls.append(repo_url)
+
+            if repo_urls:
+                _log_history(repo_urls)
 
         except Exception as exc:
             print(f"Error in _remove_old_repositories: {exc}")
@@ -110,7 +172,7 @@ async def _remove_old_repositories():
         await asyncio.sleep(60)
 
 
-async def _process_folder(folder: Path) -> None:
+async def _process_folder(folder: Path) -> Optional[str]:
     """
     Process a single folder for deletion and logging.
 
@@ -118,34 +180,58 @@ async def _process_folder(folder: Path) -> None:
     ----------
     folder : Path
         The path to the folder to be processed.
+
+    Returns
+    -------
+    str, optional
+        The URL of the repository the folder was created for, to be logged to the history, if it can be found.
     """
-    # Try to log repository URL before deletion
+    repo_url = None
+
+    # Try to find the repository URL before deletion
     try:
-        txt_files = [f for f in folder.iterdir() if f.suffix == ".txt"]
+        txt_file = next(folder.glob("*.txt"), None)
 
         # Extract owner and repository name from the filename
-        filename = txt_files[0].stem
-        if txt_files and "-" in filename:
-            owner, repo = filename.split("-", 1)
+        if txt_file is not None and "-" in txt_file.stem:
+            owner, repo = txt_file.stem.split("-", 1)
             repo_url = f"{owner}/{repo}"
 
-            with open("history.txt", mode="a", encoding="utf-8") as history:
-                history.write(f"{repo_url}\n")
-
     except Exception as exc:
         print(f"Error logging repository URL for {folder}: {exc}")
 
-    # Delete the folder
+    # Delete the folder in a worker thread: removing a large repository must not block the requests being served
     try:
-        shutil.rmtree(folder)
+        await asyncio.get_running_loop().run_in_executor(None, shutil.rmtree, folder)
     except Exception as exc:
         print(f"Error deleting {folder}: {exc}")
 
+    return repo_url
+
+
+def _log_history(repo_urls: List[str]) -> None:
+    """
+    Append the URLs of the removed repositories to history.txt, opening the file once for all of them.
 
+    Parameters
+    ----------
+    repo_urls : List[str]
+        The URLs of the repositories whose folders were removed.
+    """
+    try:
+        with open("history.txt", mode="a", encoding="utf-8") as history:
+            history.writelines(f"{repo_url}\n" for repo_url in repo_urls)
+    except Exception as exc:
+        print(f"Error logging repository URLs to history.txt: {exc}")
+
+
+@lru_cache(maxsize=512)
 def log_slider_to_size(position: int) -> int:
     """
     Convert a slider position to a file size in bytes using a logarithmic scale.
 
+    The slider only has a few hundred positions, so the results are cached.
+
     Parameters
     ----------
     position : int
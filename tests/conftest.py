@@ -1,20 +1,57 @@
 """
 Fixtures for tests.
 
-This file provides shared fixtures for creating sample queries, a temporary directory structure, and a helper function
-to write `.ipynb` notebooks for testing notebook utilities.
+This file provides shared fixtures for creating sample queries, a temporary directory structure, a helper function to
+write `.ipynb` notebooks for testing notebook utilities, and a runner for the CLI.
 """
 
 import json
+import os
+import shutil
 from pathlib import Path
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Generator
 
 import pytest
+from click.testing import CliRunner
 
 from gitingest.query_parsing import IngestionQuery
+from gitingest.utils import git_utils
 
 WriteNotebookFunc = Callable[[str, Dict[str, Any]], Path]
 
+# Resolved once, rather than with a filesystem lookup for every `sample_query`
+_SAMPLE_LOCAL_PATH = Path("/tmp/test_repo").resolve()
+_SAMPLE_IGNORE_PATTERNS = frozenset({"*.pyc", "__pycache__", ".git"})
+
+# Files of the `temp_directory` structure, with each directory's files listed together
+_TEMP_DIRECTORY_LAYOUT = (
+    ("file1.txt", b"Hello World"),
+    ("file2.py", b"print('Hello')"),
+    ("src/subfile1.txt", b"Hello from src"),
+    ("src/subfile2.py", b"print('Hello from src')"),
+    ("src/subdir/file_subdir.txt", b"Hello from subdir"),
+    ("src/subdir/file_subdir.py", b"print('Hello from subdir')"),
+    ("dir1/file_dir1.txt", b"Hello from dir1"),
+    ("dir2/file_dir2.txt", b"Hello from dir2"),
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_git_caches() -> Generator[None, None, None]:
+    """
+    Forget the repository checks and branch lists cached by `git_utils`, so that each test runs its own commands.
+
+    Yields
+    ------
+    None
+        Control is yielded to the test.
+    """
+    git_utils._repo_exists_cache.clear()  # pylint: disable=protected-access
+    git_utils._branch_list_cache.clear()  # pylint: disable=protected-access
+    yield
+    git_utils._repo_exists_cache.clear()  # pylint: disable=protected-access
+    git_utils._branch_list_cache.clear()  # pylint: disable=protected-access
+
 
 @pytest.fixture
 def sample_query() -> IngestionQuery:
@@ -33,20 +70,22 @@ def sample_query() -> IngestionQuery:
         repo_name="test_repo",
         url=None,
         subpath="/",
-        local_path=Path("/tmp/test_repo").resolve(),
+        local_path=_SAMPLE_LOCAL_PATH,
         slug="test_user/test_repo",
         id="id",
         branch="main",
         max_file_size=1_000_000,
-        ignore_patterns={"*.pyc", "__pycache__", ".git"},
+        ignore_patterns=_SAMPLE_IGNORE_PATTERNS,
         include_patterns=None,
     )
 
 
-@pytest.fixture
-def temp_directory(tmp_path: Path) -> Path:
+@pytest.fixture(scope="session")
+def _temp_directory_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
     """
-    Create a temporary directory structure for testing repository scanning.
+    Create the directory structure used by `temp_directory`, once per test session.
+
+    Tests that only read the structure may use this directory directly, without a per-test copy.
 
     The structure includes:
     test_repo/
@@ -65,46 +104,65 @@ def temp_directory(tmp_path: Path) -> Path:
 
     Parameters
     ----------
-    tmp_path : Path
-        The temporary directory path provided by the `tmp_path` fixture.
+    tmp_path_factory : pytest.TempPathFactory
+        The session-scoped factory for temporary directories.
 
     Returns
     -------
     Path
         The path to the created `test_repo` directory.
     """
-    test_dir = tmp_path / "test_repo"
-    test_dir.mkdir()
-
-    # Root files
-    (test_dir / "file1.txt").write_text("Hello World")
-    (test_dir / "file2.py").write_text("print('Hello')")
-
-    # src directory and its files
-    src_dir = test_dir / "src"
-    src_dir.mkdir()
-    (src_dir / "subfile1.txt").write_text("Hello from src")
-    (src_dir / "subfile2.py").write_text("print('Hello from src')")
-
-    # src/subdir and its files
-    subdir = src_dir / "subdir"
-    subdir.mkdir()
-    (subdir / "file_subdir.txt").write_text("Hello from subdir")
-    (subdir / "file_subdir.py").write_text("print('Hello from subdir')")
-
-    # dir1 and its file
-    dir1 = test_dir / "dir1"
-    dir1.mkdir()
-    (dir1 / "file_dir1.txt").write_text("Hello from dir1")
-
-    # dir2 and its file
-    dir2 = test_dir / "dir2"
-    dir2.mkdir()
-    (dir2 / "file_dir2.txt").write_text("Hello from dir2")
+    test_dir = tmp_path_factory.mktemp("template") / "test_repo"
+    for rel_path, data in _TEMP_DIRECTORY_LAYOUT:
+        file_path = test_dir / rel_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(data)
 
     return test_dir
 
 
+@pytest.fixture
+def temp_directory(_temp_directory_template: Path, tmp_path: Path) -> Path:
+    """
+    Provide a fresh copy of the temporary directory structure for testing repository scanning.
+
+    The structure is built once per session by `_temp_directory_template` and copied for each test, with the files
+    hard-linked (or copied where hard links are not supported) rather than rewritten. Tests may add or remove files,
+    but must not modify the existing ones in place.
+
+    Parameters
+    ----------
+    _temp_directory_template : Path
+        The directory structure shared by all tests.
+    tmp_path : Path
+        The temporary directory path provided by the `tmp_path` fixture.
+
+    Returns
+    -------
+    Path
+        The path to the copied `test_repo` directory.
+    """
+    return Path(shutil.copytree(_temp_directory_template, tmp_path / "test_repo", copy_function=_link_or_copy))
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """
+    Hard-link a file, or copy it when the filesystem does not support hard links.
+
+    Parameters
+    ----------
+    src : str
+        The path of the file to link.
+    dst : str
+        The path of the link to create.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        # `copyfile` uses `sendfile` on Linux, so the data is still copied in the kernel
+        shutil.copyfile(src, dst)
+
+
 @pytest.fixture
 def write_notebook(tmp_path: Path) -> WriteNotebookFunc:
     """
@@ -124,8 +182,20 @@ def write_notebook(tmp_path: Path) -> WriteNotebookFunc:
 
     def _write_notebook(name: str, content: Dict[str, Any]) -> Path:
         notebook_path = tmp_path / name
-        with notebook_path.open(mode="w", encoding="utf-8") as f:
-            json.dump(content, f)
+        notebook_path.write_bytes(json.dumps(content).encode("utf-8"))
         return notebook_path
 
     return _write_notebook
+
+
+@pytest.fixture(scope="session")
+def cli_runner() -> CliRunner:
+    """
+    Provide a `CliRunner` shared by the CLI tests.
+
+    Returns
+    -------
+    CliRunner
+        The runner used to invoke the CLI.
+    """
+    return CliRunner()
@@ -5,63 +5,73 @@ These tests cover URL parsing, pattern parsing, and handling of branches/subpath
 paths.
 """
 
+import asyncio
 from pathlib import Path
+from typing import Generator, List, Tuple, Union
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from gitingest.query_parsing import _parse_patterns, _parse_remote_repo, parse_query
+from gitingest.query_parsing import (
+    _parse_patterns,
+    _parse_remote_repo,
+    _split_remote_source,
+    parse_query,
+    try_domains_for_user_and_repo,
+)
 from gitingest.utils.ignore_patterns import DEFAULT_IGNORE_PATTERNS
+from gitingest.utils.query_parser_utils import KNOWN_GIT_HOSTS, _match_git_url
 
+_BRANCHES_OUTPUT = (b"refs/heads/main\nrefs/heads/dev\nrefs/heads/feature-branch\n", b"")
+_BRANCHES = ("main", "dev", "feature-branch")
 
-@pytest.mark.asyncio
-async def test_parse_url_valid_https() -> None:
-    """
-    Test `_parse_remote_repo` with valid HTTPS URLs.
+# Branches whose names contain slashes or are prefixes of one another
+_NESTED_BRANCHES_OUTPUT = (
+    b"refs/heads/feature/fix1\nrefs/heads/main\nrefs/heads/feature-branch\nrefs/heads/fix\n",
+    b"",
+)
+_NESTED_BRANCHES = ("feature/fix1", "main", "feature-branch")
 
-    Given various HTTPS URLs on supported platforms:
-    When `_parse_remote_repo` is called,
-    Then user name, repo name, and the URL should be extracted correctly.
+
+@pytest.fixture
+def mock_git_remote() -> Generator[Tuple[AsyncMock, AsyncMock], None, None]:
     """
-    test_cases = [
-        "https://github.com/user/repo",
-        "https://gitlab.com/user/repo",
-        "https://bitbucket.org/user/repo",
-        "https://gitea.com/user/repo",
-        "https://codeberg.org/user/repo",
-        "https://gist.github.com/user/repo",
-    ]
-    for url in test_cases:
-        query = await _parse_remote_repo(url)
+    Patch `run_command` and `fetch_remote_branch_list` in `git_utils` to report the branches in `_BRANCHES`.
 
-        assert query.user_name == "user"
-        assert query.repo_name == "repo"
-        assert query.url == url
+    Tests needing other branches can override the return values of the mocks.
 
+    Yields
+    ------
+    Tuple[AsyncMock, AsyncMock]
+        The mocks of `run_command` and `fetch_remote_branch_list`.
+    """
+    with patch("gitingest.utils.git_utils.run_command", new_callable=AsyncMock) as mock_run_command, patch(
+        "gitingest.utils.git_utils.fetch_remote_branch_list", new_callable=AsyncMock
+    ) as mock_fetch_branches:
+        mock_run_command.return_value = _BRANCHES_OUTPUT
+        mock_fetch_branches.return_value = _BRANCHES
+        yield mock_run_command, mock_fetch_branches
 
+
+@pytest.mark.parametrize("scheme", ["https", "http"])
+@pytest.mark.parametrize(
+    "host", ["github.com", "gitlab.com", "bitbucket.org", "gitea.com", "codeberg.org", "gist.github.com"]
+)
 @pytest.mark.asyncio
-async def test_parse_url_valid_http() -> None:
+async def test_parse_url_valid(scheme: str, host: str) -> None:
     """
-    Test `_parse_remote_repo` with valid HTTP URLs.
+    Test `_parse_remote_repo` with valid HTTP and HTTPS URLs.
 
-    Given various HTTP URLs on supported platforms:
+    Given various HTTP and HTTPS URLs on supported platforms:
     When `_parse_remote_repo` is called,
-    Then user name, repo name, and the slug should be extracted correctly.
+    Then user name, repo name, and the slug should be extracted correctly, and the URL should use HTTPS.
     """
-    test_cases = [
-        "http://github.com/user/repo",
-        "http://gitlab.com/user/repo",
-        "http://bitbucket.org/user/repo",
-        "http://gitea.com/user/repo",
-        "http://codeberg.org/user/repo",
-        "http://gist.github.com/user/repo",
-    ]
-    for url in test_cases:
-        query = await _parse_remote_repo(url)
+    query = await _parse_remote_repo(f"{scheme}://{host}/user/repo")
 
-        assert query.user_name == "user"
-        assert query.repo_name == "repo"
-        assert query.slug == "user-repo"
+    assert query.user_name == "user"
+    assert query.repo_name == "repo"
+    assert query.url == f"https://{host}/user/repo"
+    assert query.slug == "user-repo"
 
 
 @pytest.mark.asyncio
@@ -126,7 +136,7 @@ async def test_parse_query_include_pattern() -> None:
     query = await parse_query(url, max_file_size=50, from_web=True, include_patterns="*.py")
 
     assert query.include_patterns == {"*.py"}
-    assert query.ignore_patterns == DEFAULT_IGNORE_PATTERNS
+    assert query.ignore_patterns is DEFAULT_IGNORE_PATTERNS
 
 
 @pytest.mark.asyncio
@@ -144,6 +154,7 @@ async def test_parse_query_invalid_pattern() -> None:
 
 
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("mock_git_remote")
 async def test_parse_url_with_subpaths() -> None:
     """
     Test `_parse_remote_repo` with a URL containing branch and subpath.
@@ -153,18 +164,12 @@ async def test_parse_url_with_subpaths() -> None:
     Then user, repo, branch, and subpath should be identified correctly.
     """
     url = "https://github.com/user/repo/tree/main/subdir/file"
-    with patch("gitingest.utils.git_utils.run_command", new_callable=AsyncMock) as mock_run_command:
-        mock_run_command.return_value = (b"refs/heads/main\nrefs/heads/dev\nrefs/heads/feature-branch\n", b"")
-        with patch(
-            "gitingest.utils.git_utils.fetch_remote_branch_list", new_callable=AsyncMock
-        ) as mock_fetch_branches:
-            mock_fetch_branches.return_value = ["main", "dev", "feature-branch"]
-            query = await _parse_remote_repo(url)
+    query = await _parse_remote_repo(url)
 
-            assert query.user_name == "user"
-            assert query.repo_name == "repo"
-            assert query.branch == "main"
-            assert query.subpath == "/subdir/file"
+    assert query.user_name == "user"
+    assert query.repo_name == "repo"
+    assert query.branch == "main"
+    assert query.subpath == "/subdir/file"
 
 
 @pytest.mark.asyncio
@@ -195,7 +200,8 @@ def test_parse_patterns_valid() -> None:
     assert parsed_patterns == {"*.py", "*.md", "docs/*"}
 
 
-def test_parse_patterns_invalid_characters() -> None:
+@pytest.mark.parametrize("patterns", ["*.py;rm -rf", "src/$(whoami)", "*.md | cat", "docs/`id`", "a&b", "*.py?"])
+def test_parse_patterns_invalid_characters(patterns: str) -> None:
     """
     Test `_parse_patterns` with invalid characters.
 
@@ -203,7 +209,6 @@ def test_parse_patterns_invalid_characters() -> None:
     When `_parse_patterns` is called,
     Then a ValueError should be raised indicating invalid pattern syntax.
     """
-    patterns = "*.py;rm -rf"
     with pytest.raises(ValueError, match="Pattern.*contains invalid characters"):
         _parse_patterns(patterns)
 
@@ -221,7 +226,7 @@ async def test_parse_query_with_large_file_size() -> None:
     query = await parse_query(url, max_file_size=10**9, from_web=True)
 
     assert query.max_file_size == 10**9
-    assert query.ignore_patterns == DEFAULT_IGNORE_PATTERNS
+    assert query.ignore_patterns is DEFAULT_IGNORE_PATTERNS
 
 
 @pytest.mark.asyncio
@@ -237,7 +242,7 @@ async def test_parse_query_empty_patterns() -> None:
     query = await parse_query(url, max_file_size=50, from_web=True, include_patterns="", ignore_patterns="")
 
     assert query.include_patterns is None
-    assert query.ignore_patterns == DEFAULT_IGNORE_PATTERNS
+    assert query.ignore_patterns is DEFAULT_IGNORE_PATTERNS
 
 
 @pytest.mark.asyncio
@@ -324,6 +329,7 @@ async def test_parse_query_empty_source() -> None:
         ),
     ],
 )
+@pytest.mark.usefixtures("mock_git_remote")
 async def test_parse_url_branch_and_commit_distinction(url: str, expected_branch: str, expected_commit: str) -> None:
     """
     Test `_parse_remote_repo` distinguishing branch vs. commit hash.
@@ -332,19 +338,11 @@ async def test_parse_url_branch_and_commit_distinction(url: str, expected_branch
     When `_parse_remote_repo` is called with branch fetching,
     Then the function should correctly set `branch` or `commit` based on the URL content.
     """
-    with patch("gitingest.utils.git_utils.run_command", new_callable=AsyncMock) as mock_run_command:
-        # Mocking the return value to include 'main' and some additional branches
-        mock_run_command.return_value = (b"refs/heads/main\nrefs/heads/dev\nrefs/heads/feature-branch\n", b"")
-        with patch(
-            "gitingest.utils.git_utils.fetch_remote_branch_list", new_callable=AsyncMock
-        ) as mock_fetch_branches:
-            mock_fetch_branches.return_value = ["main", "dev", "feature-branch"]
+    query = await _parse_remote_repo(url)
 
-            query = await _parse_remote_repo(url)
-
-            # Verify that `branch` and `commit` match our expectations
-            assert query.branch == expected_branch
-            assert query.commit == expected_commit
+    # Verify that `branch` and `commit` match our expectations
+    assert query.branch == expected_branch
+    assert query.commit == expected_commit
 
 
 @pytest.mark.asyncio
@@ -461,7 +459,9 @@ async def test_parse_repo_source_with_failed_git_command(url, expected_branch, e
         ("https://github.com/user/repo/blob/fix/page.html", "fix", "/page.html"),
     ],
 )
-async def test_parse_repo_source_with_various_url_patterns(url, expected_branch, expected_subpath):
+async def test_parse_repo_source_with_various_url_patterns(
+    url, expected_branch, expected_subpath, mock_git_remote: Tuple[AsyncMock, AsyncMock]
+):
     """
     Test `_parse_remote_repo` with various URL patterns.
 
@@ -469,17 +469,131 @@ async def test_parse_repo_source_with_various_url_patterns(url, expected_branch,
     When `_parse_remote_repo` is called with remote branch fetching,
     Then the correct branch/subpath should be set or None if unmatched.
     """
+    mock_run_command, mock_fetch_branches = mock_git_remote
+    mock_run_command.return_value = _NESTED_BRANCHES_OUTPUT
+    mock_fetch_branches.return_value = _NESTED_BRANCHES
+
+    query = await _parse_remote_repo(url)
+
+    assert query.branch == expected_branch
+    assert query.subpath == expected_subpath
+
+
+@pytest.mark.asyncio
+async def test_parse_repo_source_reuses_branch_list() -> None:
+    """
+    Test `_parse_remote_repo` with several URLs of the same repository.
+
+    Given URLs referencing branches of one repository, parsed one after the other and concurrently:
+    When `_parse_remote_repo` is called for each of them,
+    Then the branch list should be fetched only once.
+    """
     with patch("gitingest.utils.git_utils.run_command", new_callable=AsyncMock) as mock_run_command:
-        with patch(
-            "gitingest.utils.git_utils.fetch_remote_branch_list", new_callable=AsyncMock
-        ) as mock_fetch_branches:
-            mock_run_command.return_value = (
-                b"refs/heads/feature/fix1\nrefs/heads/main\nrefs/heads/feature-branch\nrefs/heads/fix\n",
-                b"",
-            )
-            mock_fetch_branches.return_value = ["feature/fix1", "main", "feature-branch"]
+        mock_run_command.return_value = (b"refs/heads/main\nrefs/heads/dev\n", b"")
 
-            query = await _parse_remote_repo(url)
+        queries = await asyncio.gather(
+            _parse_remote_repo("https://github.com/user/repo/tree/main/src"),
+            _parse_remote_repo("https://github.com/user/repo/tree/dev/docs"),
+        )
+        query = await _parse_remote_repo("https://github.com/user/repo/tree/main/tests")
 
-            assert query.branch == expected_branch
-            assert query.subpath == expected_subpath
+        assert [q.branch for q in queries] == ["main", "dev"]
+        assert query.branch == "main"
+        ls_remote_calls = [call for call in mock_run_command.call_args_list if "ls-remote" in call.args]
+        assert len(ls_remote_calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_try_domains_prefers_first_known_host() -> None:
+    """
+    Test `try_domains_for_user_and_repo` when the repository exists on several hosts.
+
+    Given a repository slug found on GitLab and Bitbucket:
+    When `try_domains_for_user_and_repo` is called,
+    Then every host should be probed and the first matching host in `KNOWN_GIT_HOSTS` order should be returned.
+    """
+    found = {"https://gitlab.com/user/repo", "https://bitbucket.org/user/repo"}
+
+    async def _check_repos_exist(urls: List[str], return_exceptions: bool) -> List[bool]:
+        assert return_exceptions
+        return [url in found for url in urls]
+
+    with patch("gitingest.query_parsing.check_repos_exist", side_effect=_check_repos_exist) as mock_check:
+        domain = await try_domains_for_user_and_repo("user", "repo")
+
+    assert domain == "gitlab.com"
+    mock_check.assert_called_once_with(
+        [f"https://{host}/user/repo" for host in KNOWN_GIT_HOSTS], return_exceptions=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_try_domains_ignores_errors_after_first_match() -> None:
+    """
+    Test `try_domains_for_user_and_repo` when a host after the matching one fails.
+
+    Given a repository found on GitHub, while every other host answers with an unexpected status code:
+    When `try_domains_for_user_and_repo` is called,
+    Then GitHub should be returned, and the errors of the other hosts should be ignored.
+    """
+
+    async def _check_repos_exist(urls: List[str], return_exceptions: bool) -> List[Union[bool, BaseException]]:
+        assert return_exceptions
+        return [True] + [RuntimeError(f"Unexpected status code for {url}: 429") for url in urls[1:]]
+
+    with patch("gitingest.query_parsing.check_repos_exist", side_effect=_check_repos_exist):
+        assert await try_domains_for_user_and_repo("user", "repo") == KNOWN_GIT_HOSTS[0]
+
+    async def _check_repos_exist_failing_first(
+        urls: List[str], return_exceptions: bool
+    ) -> List[Union[bool, BaseException]]:
+        assert return_exceptions
+        return [RuntimeError(f"Unexpected status code for {urls[0]}: 429")] + [True] * (len(urls) - 1)
+
+    with patch("gitingest.query_parsing.check_repos_exist", side_effect=_check_repos_exist_failing_first):
+        with pytest.raises(RuntimeError, match="429"):
+            await try_domains_for_user_and_repo("user", "repo")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://github.com/user/repo",
+        "HTTPS://GitHub.COM/User/Repo/",
+        "https://gitlab.com/user/repo/-/tree/Main/src/",
+        "https://github.com/user/repo//docs",
+        "https://github.com/user/repo/tree/main?tab=readme#top",
+        "http://gist.github.com/user/0123abcd",
+    ],
+)
+async def test_match_git_url_agrees_with_urlparse(url: str) -> None:
+    """
+    Test the regex fast path for repository URLs against the `urlparse` path.
+
+    Given plain URLs of repositories on known hosts:
+    When `_match_git_url` and `_split_remote_source` are called,
+    Then both should return the same host, names and remaining path parts.
+    """
+    assert _match_git_url(url) == await _split_remote_source(url)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://github.com:443/user/repo",
+        "https://user@github.com/user/repo",
+        "https://github.com/user/repo;params",
+        "https://example.com/user/repo",
+        "github.com/user/repo",
+    ],
+)
+def test_match_git_url_leaves_unusual_urls_to_urlparse(url: str) -> None:
+    """
+    Test the regex fast path for repository URLs with URLs it should not handle.
+
+    Given URLs with a port, credentials, path parameters, an unknown host or no scheme:
+    When `_match_git_url` is called,
+    Then it should return None, so that the URL is parsed with `urlparse`.
+    """
+    assert _match_git_url(url) is None
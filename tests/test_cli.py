@@ -1,29 +1,21 @@
 """Tests for the gitingest cli."""
 
 import os
+from pathlib import Path
+from typing import List
 
+import pytest
 from click.testing import CliRunner
 
 from gitingest.cli import main
 from gitingest.config import MAX_FILE_SIZE, OUTPUT_FILE_NAME
 
 
-def test_cli_with_default_options():
-    runner = CliRunner()
-    result = runner.invoke(main, ["./"])
-    output_lines = result.output.strip().split("\n")
-    assert f"Analysis complete! Output written to: {OUTPUT_FILE_NAME}" in output_lines
-    assert os.path.exists(OUTPUT_FILE_NAME), f"Output file was not created at {OUTPUT_FILE_NAME}"
-
-    os.remove(OUTPUT_FILE_NAME)
-
-
-def test_cli_with_options():
-    runner = CliRunner()
-    result = runner.invoke(
-        main,
+@pytest.mark.parametrize(
+    "options",
+    [
+        [],
         [
-            "./",
             "--output",
             str(OUTPUT_FILE_NAME),
             "--max-size",
@@ -33,9 +25,19 @@ def test_cli_with_options():
             "--include-pattern",
             "src/",
         ],
-    )
+    ],
+    ids=["default_options", "with_options"],
+)
+def test_cli(
+    options: List[str],
+    cli_runner: CliRunner,
+    _temp_directory_template: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Run in an empty directory, so that the output file does not clash with other tests
+    monkeypatch.chdir(tmp_path)
+    result = cli_runner.invoke(main, [str(_temp_directory_template), *options])
     output_lines = result.output.strip().split("\n")
     assert f"Analysis complete! Output written to: {OUTPUT_FILE_NAME}" in output_lines
     assert os.path.exists(OUTPUT_FILE_NAME), f"Output file was not created at {OUTPUT_FILE_NAME}"
-
-    os.remove(OUTPUT_FILE_NAME)
@@ -1,24 +1,27 @@
 """Integration tests covering core functionalities, edge cases, and concurrency handling."""
 
+import asyncio
+import importlib
 import shutil
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest.mock import patch
+from typing import Dict
+from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
 
+from gitingest.schemas import CloneConfig
 from src.server.main import app
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 TEMPLATE_DIR = BASE_DIR / "src" / "templates"
 
 
-@pytest.fixture(scope="module")
-def test_client():
-    """Create a test client fixture."""
-    with TestClient(app) as client_instance:
-        client_instance.headers.update({"Host": "localhost"})
+@pytest.fixture(scope="module", name="test_client")
+async def fixture_test_client():
+    """Create a test client fixture that sends the requests to the app on the test event loop."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client_instance:
         yield client_instance
 
 
@@ -30,127 +33,81 @@ def mock_static_files():
         yield mock_static
 
 
-@pytest.fixture(scope="module", autouse=True)
-def mock_templates():
+@pytest.fixture(scope="module", autouse=True, name="mock_templates")
+def fixture_mock_templates():
     """Mock Jinja2 template rendering to bypass actual file loading."""
     with patch("starlette.templating.Jinja2Templates.TemplateResponse") as mock_template:
         mock_template.return_value = "Mocked Template Response"
         yield mock_template
 
 
-def cleanup_temp_directories():
-    temp_dir = Path("/tmp/gitingest")
-    if temp_dir.exists():
-        try:
-            shutil.rmtree(temp_dir)
-        except PermissionError as exc:
-            print(f"Error cleaning up {temp_dir}: {exc}")
-
-
 @pytest.fixture(scope="module", autouse=True)
-def cleanup():
-    """Cleanup temporary directories after tests."""
-    yield
-    cleanup_temp_directories()
-
-
-@pytest.mark.asyncio
-async def test_remote_repository_analysis(request):
-    """Test the complete flow of analyzing a remote repository."""
-    client = request.getfixturevalue("test_client")
-    form_data = {
-        "input_text": "https://github.com/octocat/Hello-World",
-        "max_file_size": "243",
-        "pattern_type": "exclude",
-        "pattern": "",
-    }
-
-    response = client.post("/", data=form_data)
-    assert response.status_code == 200, f"Form submission failed: {response.text}"
-    assert "Mocked Template Response" in response.text
+def tmp_base_path(tmp_path_factory: pytest.TempPathFactory):
+    """Store the cloned repositories and digests in a temporary directory managed by pytest."""
+    base_path = tmp_path_factory.mktemp("gitingest")
+    with pytest.MonkeyPatch.context() as mp:
+        # Each module imports the path by name, so it is patched where it is used
+        for module_name in (
+            "gitingest.config",
+            "gitingest.query_parsing",
+            "server.server_utils",
+            "server.routers.download",
+        ):
+            mp.setattr(importlib.import_module(module_name), "TMP_BASE_PATH", base_path)
+        yield base_path
 
 
+@pytest.fixture(scope="module", autouse=True)
+def mock_clone_repo(_temp_directory_template: Path):
+    """Replace cloning with a copy of the sample repository, so that the tests do not reach the network."""
+
+    async def _clone_repo(config: CloneConfig) -> None:
+        if "/nonexistent/" in config.url:
+            raise ValueError("Repository not found, make sure it is public")
+        shutil.copytree(_temp_directory_template, config.local_path)
+
+    with patch("server.query_processor.clone_repo", side_effect=_clone_repo) as mock_clone:
+        yield mock_clone
+
+
+def _form_data(
+    input_text: str, max_file_size: str = "243", pattern_type: str = "exclude", pattern: str = ""
+) -> Dict[str, str]:
+    """Build the data of the form submitted on the index page."""
+    return {"input_text": input_text, "max_file_size": max_file_size, "pattern_type": pattern_type, "pattern": pattern}
+
+
+@pytest.mark.parametrize(
+    "form_data, expect_error",
+    [
+        # The complete flow of analyzing a remote repository
+        (_form_data("https://github.com/octocat/Hello-World"), False),
+        # A repository that cannot be cloned
+        (_form_data("https://github.com/nonexistent/repo"), True),
+        # Repository analysis with an include pattern
+        (_form_data("https://github.com/octocat/Hello-World", pattern_type="include", pattern="*.md"), False),
+    ],
+    ids=["remote", "invalid", "patterns"],
+)
 @pytest.mark.asyncio
-async def test_invalid_repository_url(request):
-    """Test handling of an invalid repository URL."""
-    client = request.getfixturevalue("test_client")
-    form_data = {
-        "input_text": "https://github.com/nonexistent/repo",
-        "max_file_size": "243",
-        "pattern_type": "exclude",
-        "pattern": "",
-    }
-
-    response = client.post("/", data=form_data)
+async def test_repository_analysis(
+    test_client: httpx.AsyncClient, mock_templates: MagicMock, form_data: Dict[str, str], expect_error: bool
+):
+    """Test the analysis of a repository submitted through the form."""
+    response = await test_client.post("/", data=form_data)
     assert response.status_code == 200, f"Request failed: {response.text}"
     assert "Mocked Template Response" in response.text
 
-
-@pytest.mark.asyncio
-async def test_large_repository(request):
-    """Simulate analysis of a large repository with nested folders."""
-    client = request.getfixturevalue("test_client")
-    form_data = {
-        "input_text": "https://github.com/large/repo-with-many-files",
-        "max_file_size": "243",
-        "pattern_type": "exclude",
-        "pattern": "",
-    }
-
-    response = client.post("/", data=form_data)
-    assert response.status_code == 200, f"Request failed: {response.text}"
-    assert "Mocked Template Response" in response.text
+    context = mock_templates.call_args.kwargs["context"]
+    assert ("error_message" in context) == expect_error
+    assert context.get("result", False) != expect_error
 
 
 @pytest.mark.asyncio
-async def test_concurrent_requests(request):
+async def test_concurrent_requests(test_client: httpx.AsyncClient):
     """Test handling of multiple concurrent requests."""
-    client = request.getfixturevalue("test_client")
-
-    def make_request():
-        form_data = {
-            "input_text": "https://github.com/octocat/Hello-World",
-            "max_file_size": "243",
-            "pattern_type": "exclude",
-            "pattern": "",
-        }
-        response = client.post("/", data=form_data)
+    form_data = _form_data("https://github.com/octocat/Hello-World")
+    responses = await asyncio.gather(*(test_client.post("/", data=form_data) for _ in range(5)))
+    for response in responses:
         assert response.status_code == 200, f"Request failed: {response.text}"
         assert "Mocked Template Response" in response.text
-
-    with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = [executor.submit(make_request) for _ in range(5)]
-        for future in futures:
-            future.result()
-
-
-@pytest.mark.asyncio
-async def test_large_file_handling(request):
-    """Test handling of repositories with large files."""
-    client = request.getfixturevalue("test_client")
-    form_data = {
-        "input_text": "https://github.com/octocat/Hello-World",
-        "max_file_size": "1",
-        "pattern_type": "exclude",
-        "pattern": "",
-    }
-
-    response = client.post("/", data=form_data)
-    assert response.status_code == 200, f"Request failed: {response.text}"
-    assert "Mocked Template Response" in response.text
-
-
-@pytest.mark.asyncio
-async def test_repository_with_patterns(request):
-    """Test repository analysis with include/exclude patterns."""
-    client = request.getfixturevalue("test_client")
-    form_data = {
-        "input_text": "https://github.com/octocat/Hello-World",
-        "max_file_size": "243",
-        "pattern_type": "include",
-        "pattern": "*.md",
-    }
-
-    response = client.post("/", data=form_data)
-    assert response.status_code == 200, f"Request failed: {response.text}"
-    assert "Mocked Template Response" in response.text
@@ -5,13 +5,17 @@ These tests validate directory scanning, file content extraction, notebook handl
 including filtering patterns and subpaths.
 """
 
+import logging
 from pathlib import Path
 
+import pytest
+
 from gitingest.ingestion import ingest_query
 from gitingest.query_parsing import IngestionQuery
+from gitingest.schemas import FileSystemNode
 
 
-def test_run_ingest_query(temp_directory: Path, sample_query: IngestionQuery) -> None:
+def test_run_ingest_query(_temp_directory_template: Path, sample_query: IngestionQuery) -> None:
     """
     Test `ingest_query` to ensure it processes the directory and returns expected results.
 
@@ -19,7 +23,7 @@ def test_run_ingest_query(temp_directory: Path, sample_query: IngestionQuery) ->
     When `ingest_query` is invoked,
     Then it should produce a summary string listing the files analyzed and a combined content string.
     """
-    sample_query.local_path = temp_directory
+    sample_query.local_path = _temp_directory_template
     sample_query.subpath = "/"
     sample_query.type = None
 
@@ -39,8 +43,168 @@ def test_run_ingest_query(temp_directory: Path, sample_query: IngestionQuery) ->
     assert "dir2/file_dir2.txt" in content
 
 
+def test_include_txt_pattern(_temp_directory_template: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test `ingest_query` with an include pattern matching files in nested directories.
+
+    Given a directory with .txt and .py files at several depths:
+    When `ingest_query` is invoked with the include pattern "*.txt",
+    Then every .txt file should be included, including those in subdirectories, and no .py file should be.
+    """
+    sample_query.local_path = _temp_directory_template
+    sample_query.include_patterns = {"*.txt"}
+
+    summary, _, content = ingest_query(sample_query)
+
+    assert "Files analyzed: 5" in summary
+    assert "src/subdir/file_subdir.txt" in content
+    assert "dir2/file_dir2.txt" in content
+    assert ".py" not in content
+
+
+def test_exclude_directory_pattern(_temp_directory_template: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test `ingest_query` with an ignore pattern targeting a directory.
+
+    Given a directory containing a `src/` subdirectory:
+    When `ingest_query` is invoked with the ignore pattern "src/*",
+    Then the `src/` directory should not appear in the tree or in the content.
+    """
+    sample_query.local_path = _temp_directory_template
+    sample_query.ignore_patterns = {"src/*"}
+
+    summary, tree, content = ingest_query(sample_query)
+
+    assert "Files analyzed: 4" in summary
+    assert "src/" not in tree
+    assert "src/" not in content
+
+
+def test_file_over_max_size_is_omitted(temp_directory: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test `ingest_query` with a file larger than the maximum file size.
+
+    Given a directory containing a file larger than `max_file_size`:
+    When `ingest_query` is invoked,
+    Then the file should be listed with a placeholder instead of its content.
+    """
+    (temp_directory / "large.txt").write_text("x" * 100)
+    sample_query.local_path = temp_directory
+    sample_query.max_file_size = 50
+
+    summary, tree, content = ingest_query(sample_query)
+
+    assert "Files analyzed: 9" in summary
+    assert "large.txt" in tree
+    assert "[File omitted: 100 bytes exceeds the maximum file size]" in content
+    assert "x" * 100 not in content
+    assert "Hello World" in content
+
+
+def test_binary_file_is_not_read(temp_directory: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test `ingest_query` with a file made mostly of control bytes.
+
+    Given a directory containing a file whose first bytes are mostly not text (but contain no NUL byte):
+    When `ingest_query` is invoked,
+    Then the file should be listed as a non-text file.
+    """
+    (temp_directory / "data.bin").write_bytes(bytes(range(1, 7)) * 100)
+    sample_query.local_path = temp_directory
+
+    _, tree, content = ingest_query(sample_query)
+
+    assert "data.bin" in tree
+    assert "FILE: data.bin\n" + "=" * 48 + "\n[Non-text file]" in content
+    assert "Hello World" in content
+
+
+def test_single_file_is_read_once(
+    temp_directory: Path, sample_query: IngestionQuery, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test `ingest_query` on a single file.
+
+    Given a query pointing to one file:
+    When `ingest_query` is invoked,
+    Then the file should be read only once, although its content is used for the check, the summary and the output.
+    """
+    read_paths = []
+    read_content = FileSystemNode._read_content  # pylint: disable=protected-access
+
+    def _counting_read_content(node: FileSystemNode) -> str:
+        read_paths.append(node.path)
+        return read_content(node)
+
+    monkeypatch.setattr(FileSystemNode, "_read_content", _counting_read_content)
+    sample_query.local_path = temp_directory / "file1.txt"
+    sample_query.type = "blob"
+
+    summary, _, content = ingest_query(sample_query)
+
+    assert "Lines: 1" in summary
+    assert "Hello World" in content
+    assert read_paths == [temp_directory / "file1.txt"]
+
+
+def test_symlink_shows_target(temp_directory: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test `ingest_query` with a symlink in the directory.
+
+    Given a directory containing a symlink to one of its files:
+    When `ingest_query` is invoked,
+    Then the symlink should be listed with the name of its target, both in the tree and in the content.
+    """
+    (temp_directory / "link.txt").symlink_to(temp_directory / "file1.txt")
+    sample_query.local_path = temp_directory
+
+    _, tree, content = ingest_query(sample_query)
+
+    assert "link.txt -> file1.txt\n" in tree
+    assert "SYMLINK: link.txt -> file1.txt\n" in content
+
+
+def test_crlf_newlines_are_translated(temp_directory: Path, sample_query: IngestionQuery) -> None:
+    """
+    Test `ingest_query` with a file using Windows line endings.
+
+    Given a directory containing a file with CRLF line endings:
+    When `ingest_query` is invoked,
+    Then its content should use plain newlines, as when the file is read in text mode.
+    """
+    (temp_directory / "windows.txt").write_bytes(b"first line\r\nsecond line\r\n")
+    sample_query.local_path = temp_directory
+
+    _, _, content = ingest_query(sample_query)
+
+    assert "first line\nsecond line\n" in content
+    assert "\r" not in content
+
+
+def test_max_files_limit_stops_walk(
+    temp_directory: Path,
+    sample_query: IngestionQuery,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """
+    Test `ingest_query` when the maximum number of files is reached.
+
+    Given a directory with more files than the file limit:
+    When `ingest_query` is invoked,
+    Then the walk should stop at the limit and a single warning should be logged.
+    """
+    monkeypatch.setattr("gitingest.ingestion.MAX_FILES", 3)
+    sample_query.local_path = temp_directory
+
+    with caplog.at_level(logging.WARNING, logger="gitingest.ingestion"):
+        summary, _, _ = ingest_query(sample_query)
+
+    assert "Files analyzed: 3" in summary
+    assert [record.getMessage() for record in caplog.records] == ["Maximum file limit (3) reached"]
+
+
 # TODO: Additional tests:
 # - Multiple include patterns, e.g. ["*.txt", "*.py"] or ["/src/*", "*.txt"].
 # - Edge cases with weird file names or deep subdirectory structures.
-# TODO : def test_include_txt_pattern
 # TODO : def test_include_nonexistent_extension
@@ -6,11 +6,58 @@ converted to triple-quoted blocks, code cells remain executable code, and variou
 empty cells, outputs, etc.) are handled appropriately.
 """
 
+from typing import Any, Dict, List
+
 import pytest
 
 from gitingest.utils.notebook_utils import process_notebook
 from tests.conftest import WriteNotebookFunc
 
+_NB_ALL_CELLS = {
+    "cells": [
+        {"cell_type": "markdown", "source": ["# Markdown cell"]},
+        {"cell_type": "code", "source": ['print("Hello Code")']},
+        {"cell_type": "raw", "source": ["<raw content>"]},
+    ]
+}
+
+_NB_CODE_ONLY = {
+    "cells": [
+        {"cell_type": "code", "source": ["print('Code Cell 1')"]},
+        {"cell_type": "code", "source": ["x = 42"]},
+    ]
+}
+
+_NB_MARKDOWN_ONLY = {
+    "cells": [
+        {"cell_type": "markdown", "source": ["# Markdown Header"]},
+        {"cell_type": "markdown", "source": ["Some more markdown."]},
+    ]
+}
+
+_NB_RAW_ONLY = {
+    "cells": [
+        {"cell_type": "raw", "source": ["Raw content line 1"]},
+        {"cell_type": "raw", "source": ["Raw content line 2"]},
+    ]
+}
+
+_NB_EMPTY_CELLS = {
+    "cells": [
+        {"cell_type": "markdown", "source": []},
+        {"cell_type": "code", "source": []},
+        {"cell_type": "raw", "source": []},
+        {"cell_type": "markdown", "source": ["# Non-empty markdown"]},
+    ]
+}
+
+_NB_INVALID_CELL_TYPE = {
+    "cells": [
+        {"cell_type": "markdown", "source": ["# Valid markdown"]},
+        {"cell_type": "unknown", "source": ["Unrecognized cell type"]},
+    ]
+}
+
 
 def test_process_notebook_all_cells(write_notebook: WriteNotebookFunc) -> None:
     """
@@ -23,14 +70,7 @@ def test_process_notebook_all_cells(write_notebook: WriteNotebookFunc) -> None:
     When `process_notebook` is invoked,
     Then markdown and raw cells should appear in triple-quoted blocks, and code cells remain as normal code.
     """
-    notebook_content = {
-        "cells": [
-            {"cell_type": "markdown", "source": ["# Markdown cell"]},
-            {"cell_type": "code", "source": ['print("Hello Code")']},
-            {"cell_type": "raw", "source": ["<raw content>"]},
-        ]
-    }
-    nb_path = write_notebook("all_cells.ipynb", notebook_content)
+    nb_path = write_notebook("all_cells.ipynb", _NB_ALL_CELLS)
     result = process_notebook(nb_path)
 
     assert result.count('"""') == 4, "Two non-code cells => 2 triple-quoted blocks => 4 total triple quotes."
@@ -53,18 +93,8 @@ def test_process_notebook_with_worksheets(write_notebook: WriteNotebookFunc) ->
     Then a `DeprecationWarning` should be raised, and the content should match an equivalent notebook
     that has top-level 'cells'.
     """
-    with_worksheets = {
-        "worksheets": [
-            {
-                "cells": [
-                    {"cell_type": "markdown", "source": ["# Markdown cell"]},
-                    {"cell_type": "code", "source": ['print("Hello Code")']},
-                    {"cell_type": "raw", "source": ["<raw content>"]},
-                ]
-            }
-        ]
-    }
-    without_worksheets = with_worksheets["worksheets"][0]  # same, but no 'worksheets' key
+    with_worksheets = {"worksheets": [_NB_ALL_CELLS]}
+    without_worksheets = _NB_ALL_CELLS  # same, but no 'worksheets' key
 
     nb_with = write_notebook("with_worksheets.ipynb", with_worksheets)
     nb_without = write_notebook("without_worksheets.ipynb", without_worksheets)
@@ -128,93 +158,37 @@ def test_process_notebook_multiple_worksheets(write_notebook: WriteNotebookFunc)
     assert "# Second Worksheet" in result_multi
 
 
-def test_process_notebook_code_only(write_notebook: WriteNotebookFunc) -> None:
-    """
-    Test a notebook containing only code cells.
-
-    Given a notebook with code cells only:
-    When `process_notebook` is called,
-    Then no triple quotes should appear in the output.
-    """
-    notebook_content = {
-        "cells": [
-            {"cell_type": "code", "source": ["print('Code Cell 1')"]},
-            {"cell_type": "code", "source": ["x = 42"]},
-        ]
-    }
-    nb_path = write_notebook("code_only.ipynb", notebook_content)
-    result = process_notebook(nb_path)
-
-    assert '"""' not in result, "No triple quotes expected when there are only code cells."
-    assert "print('Code Cell 1')" in result
-    assert "x = 42" in result
-
-
-def test_process_notebook_markdown_only(write_notebook: WriteNotebookFunc) -> None:
-    """
-    Test a notebook with only markdown cells.
-
-    Given a notebook with two markdown cells:
-    When `process_notebook` is called,
-    Then each markdown cell should become a triple-quoted block (2 blocks => 4 triple quotes total).
-    """
-    notebook_content = {
-        "cells": [
-            {"cell_type": "markdown", "source": ["# Markdown Header"]},
-            {"cell_type": "markdown", "source": ["Some more markdown."]},
-        ]
-    }
-    nb_path = write_notebook("markdown_only.ipynb", notebook_content)
-    result = process_notebook(nb_path)
-
-    assert result.count('"""') == 4, "Two markdown cells => 2 blocks => 4 triple quotes total."
-    assert "# Markdown Header" in result
-    assert "Some more markdown." in result
-
-
-def test_process_notebook_raw_only(write_notebook: WriteNotebookFunc) -> None:
+@pytest.mark.parametrize(
+    "notebook, triple_quote_count, expected_strings",
+    [
+        # Code cells are not quoted
+        (_NB_CODE_ONLY, 0, ["print('Code Cell 1')", "x = 42"]),
+        # Each markdown cell becomes a triple-quoted block
+        (_NB_MARKDOWN_ONLY, 4, ["# Markdown Header", "Some more markdown."]),
+        # Each raw cell becomes a triple-quoted block
+        (_NB_RAW_ONLY, 4, ["Raw content line 1", "Raw content line 2"]),
+        # Cells with an empty source are skipped
+        (_NB_EMPTY_CELLS, 2, ["# Non-empty markdown"]),
+    ],
+    ids=["code_only", "markdown_only", "raw_only", "empty_cells"],
+)
+def test_process_notebook_cell_types(
+    write_notebook: WriteNotebookFunc, notebook: Dict[str, Any], triple_quote_count: int, expected_strings: List[str]
+) -> None:
     """
-    Test a notebook with only raw cells.
+    Test notebooks made of a single kind of cell, or with empty cells.
 
-    Given two raw cells:
+    Given a notebook with code, markdown, or raw cells only, or with cells whose `source` is empty:
     When `process_notebook` is called,
-    Then each raw cell should become a triple-quoted block (2 blocks => 4 triple quotes total).
+    Then every non-code, non-empty cell should become a triple-quoted block, and the content of every non-empty cell
+    should appear in the output.
     """
-    notebook_content = {
-        "cells": [
-            {"cell_type": "raw", "source": ["Raw content line 1"]},
-            {"cell_type": "raw", "source": ["Raw content line 2"]},
-        ]
-    }
-    nb_path = write_notebook("raw_only.ipynb", notebook_content)
+    nb_path = write_notebook("cell_types.ipynb", notebook)
     result = process_notebook(nb_path)
 
-    assert result.count('"""') == 4, "Two raw cells => 2 blocks => 4 triple quotes."
-    assert "Raw content line 1" in result
-    assert "Raw content line 2" in result
-
-
-def test_process_notebook_empty_cells(write_notebook: WriteNotebookFunc) -> None:
-    """
-    Test that cells with an empty 'source' are skipped.
-
-    Given a notebook with 4 cells, 3 of which have empty `source`:
-    When `process_notebook` is called,
-    Then only the non-empty cell should appear in the output (1 block => 2 triple quotes).
-    """
-    notebook_content = {
-        "cells": [
-            {"cell_type": "markdown", "source": []},
-            {"cell_type": "code", "source": []},
-            {"cell_type": "raw", "source": []},
-            {"cell_type": "markdown", "source": ["# Non-empty markdown"]},
-        ]
-    }
-    nb_path = write_notebook("empty_cells.ipynb", notebook_content)
-    result = process_notebook(nb_path)
-
-    assert result.count('"""') == 2, "Only one non-empty cell => 1 block => 2 triple quotes"
-    assert "# Non-empty markdown" in result
+    assert result.count('"""') == triple_quote_count
+    missing = [expected for expected in expected_strings if expected not in result]
+    assert not missing, f"Missing from the output: {missing}"
 
 
 def test_process_notebook_invalid_cell_type(write_notebook: WriteNotebookFunc) -> None:
@@ -225,13 +199,7 @@ def test_process_notebook_invalid_cell_type(write_notebook: WriteNotebookFunc) -
     When `process_notebook` is called,
     Then a ValueError should be raised.
     """
-    notebook_content = {
-        "cells": [
-            {"cell_type": "markdown", "source": ["# Valid markdown"]},
-            {"cell_type": "unknown", "source": ["Unrecognized cell type"]},
-        ]
-    }
-    nb_path = write_notebook("invalid_cell_type.ipynb", notebook_content)
+    nb_path = write_notebook("invalid_cell_type.ipynb", _NB_INVALID_CELL_TYPE)
 
     with pytest.raises(ValueError, match="Unknown cell type: unknown"):
         process_notebook(nb_path)
@@ -292,3 +260,58 @@ def test_process_notebook_with_output(write_notebook: WriteNotebookFunc) -> None
 
     assert with_output == expected_combined, "Should include source code and comment-ified output."
     assert without_output == expected_source, "Should include only the source code without output."
+
+
+def test_process_notebook_ignores_non_text_output(write_notebook: WriteNotebookFunc) -> None:
+    """
+    Test a notebook whose outputs embed rich data next to their plain text representation.
+
+    Given a code cell with a display output containing an image and plain text:
+    When `process_notebook` is called with `include_output=True`,
+    Then only the plain text representation should be included in the output.
+    """
+    notebook_content = {
+        "cells": [
+            {
+                "cell_type": "code",
+                "source": ["plt.plot([1, 2, 3])"],
+                "outputs": [
+                    {
+                        "output_type": "display_data",
+                        "data": {"image/png": "iVBORw0KGgo=", "text/plain": ["<Figure size 640x480 with 1 Axes>"]},
+                        "metadata": {},
+                    },
+                ],
+            }
+        ]
+    }
+
+    nb_path = write_notebook("with_image.ipynb", notebook_content)
+    result = process_notebook(nb_path, include_output=True)
+
+    assert "#   <Figure size 640x480 with 1 Axes>" in result
+    assert "iVBORw0KGgo=" not in result
+
+
+def test_process_notebook_multiline_output(write_notebook: WriteNotebookFunc) -> None:
+    """
+    Test a notebook whose output lines keep their trailing newlines, as saved by Jupyter.
+
+    Given a code cell with a stream output made of newline-terminated lines:
+    When `process_notebook` is called with `include_output=True`,
+    Then every output line should be commented exactly once, without blank lines in between.
+    """
+    notebook_content = {
+        "cells": [
+            {
+                "cell_type": "code",
+                "source": ["for i in range(3):\n", "    print(i)"],
+                "outputs": [{"output_type": "stream", "text": ["0\n", "1\n", "2\n"]}],
+            }
+        ]
+    }
+
+    nb_path = write_notebook("multiline_output.ipynb", notebook_content)
+    result = process_notebook(nb_path, include_output=True)
+
+    assert result.endswith("    print(i)\n# Output:\n#   0\n#   1\n#   2\n")
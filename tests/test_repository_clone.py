@@ -6,19 +6,129 @@ and handling edge cases such as nonexistent URLs, timeouts, redirects, and speci
 """
 
 import asyncio
-import os
+import subprocess
+import sys
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
+from typing import Dict, List, Optional, Set, Tuple
+from unittest.mock import patch
 
+import httpx
 import pytest
 
-from gitingest.cloning import check_repo_exists, clone_repo
+from gitingest import cloning
+from gitingest.cloning import check_repo_exists, clone_repo, clone_repos
 from gitingest.schemas import CloneConfig
+from gitingest.utils import git_utils
 from gitingest.utils.exceptions import AsyncTimeoutError
+from gitingest.utils.git_utils import GIT_CLONE_REVISION_VERSION, check_repos_exist, run_command
+
+RunCommandCalls = List[Tuple[str, ...]]
+
+_OLD_GIT_VERSION = (2, 39, 5)  # Without `git clone --revision`
+
+
+@pytest.fixture(name="run_command_calls")
+def fixture_run_command_calls(monkeypatch: pytest.MonkeyPatch) -> RunCommandCalls:
+    """
+    Replace `run_command` in the `cloning` module with a fake that records the commands instead of running them.
+
+    The Git version seen by `clone_repo` is pinned to `_OLD_GIT_VERSION`; tests may change it with `_use_git_version`.
+
+    Parameters
+    ----------
+    monkeypatch : pytest.MonkeyPatch
+        The pytest monkeypatch fixture.
+
+    Returns
+    -------
+    RunCommandCalls
+        The arguments of each call to `run_command`, in order.
+    """
+    calls: RunCommandCalls = []
+
+    async def _fake_run_command(*args: str, capture: bool = True) -> Tuple[bytes, bytes]:
+        assert not capture, "The output of the clone commands is not used"
+        calls.append(args)
+        return b"", b""
+
+    monkeypatch.setattr(cloning, "run_command", _fake_run_command)
+    _use_git_version(monkeypatch, _OLD_GIT_VERSION)
+    return calls
+
+
+def _use_git_version(monkeypatch: pytest.MonkeyPatch, version: Tuple[int, ...]) -> None:
+    """Make `clone_repo` see the given Git version."""
+
+    async def _fake_ensure_git_installed() -> Tuple[int, ...]:
+        return version
+
+    monkeypatch.setattr(cloning, "ensure_git_installed", _fake_ensure_git_installed)
+
+
+def _mock_http(monkeypatch: pytest.MonkeyPatch, status_codes: Dict[str, Optional[int]]) -> List[str]:
+    """
+    Answer the HTTP requests of the repository checks with the given status codes.
+
+    Parameters
+    ----------
+    monkeypatch : pytest.MonkeyPatch
+        The pytest monkeypatch fixture.
+    status_codes : Dict[str, Optional[int]]
+        The status code for each URL, or `None` to make the connection fail.
+
+    Returns
+    -------
+    List[str]
+        The URLs requested, in order.
+    """
+    requested_urls: List[str] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        requested_urls.append(url)
+        status_code = status_codes[url]
+        if status_code is None:
+            raise httpx.ConnectError("Connection refused", request=request)
+        return httpx.Response(status_code)
+
+    transport = httpx.MockTransport(_handler)
+    monkeypatch.setattr(git_utils, "_new_http_client", lambda: httpx.AsyncClient(transport=transport))
+    return requested_urls
+
+
+@pytest.fixture(name="local_bare_repo", scope="session")
+def fixture_local_bare_repo(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """
+    Create a bare repository with a single commit on its `main` branch, once per test session.
+
+    Parameters
+    ----------
+    tmp_path_factory : pytest.TempPathFactory
+        The session-scoped factory for temporary directories.
+
+    Returns
+    -------
+    Path
+        The path to the bare repository.
+    """
+    base_path = tmp_path_factory.mktemp("remote")
+    work_path = base_path / "work"
+    bare_path = base_path / "repo.git"
+    git_user = ("-c", "user.name=gitingest", "-c", "user.email=gitingest@example.com")
+
+    for cmd in (
+        ("git", "init", "-q", str(work_path)),
+        ("git", "-C", str(work_path), "symbolic-ref", "HEAD", "refs/heads/main"),
+        ("git", "-C", str(work_path), *git_user, "commit", "-q", "--allow-empty", "-m", "Initial commit"),
+        ("git", "clone", "-q", "--bare", str(work_path), str(bare_path)),
+    ):
+        subprocess.run(cmd, check=True)
+
+    return bare_path
 
 
 @pytest.mark.asyncio
-async def test_clone_with_commit() -> None:
+async def test_clone_with_commit(run_command_calls: RunCommandCalls) -> None:
     """
     Test cloning a repository with a specific commit hash.
 
@@ -33,20 +143,15 @@ async def test_clone_with_commit() -> None:
         branch="main",
     )
 
-    with patch("gitingest.cloning.check_repo_exists", return_value=True) as mock_check:
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            mock_process = AsyncMock()
-            mock_process.communicate.return_value = (b"output", b"error")
-            mock_exec.return_value = mock_process
-
-            await clone_repo(clone_config)
+    with patch.object(cloning, "check_repo_exists", return_value=True) as mock_check:
+        await clone_repo(clone_config)
 
-            mock_check.assert_called_once_with(clone_config.url)
-            assert mock_exec.call_count == 2  # Clone and checkout calls
+        mock_check.assert_not_called()
+        assert len(run_command_calls) == 2  # Clone and checkout calls
 
 
 @pytest.mark.asyncio
-async def test_clone_without_commit() -> None:
+async def test_clone_without_commit(run_command_calls: RunCommandCalls) -> None:
     """
     Test cloning a repository when no commit hash is provided.
 
@@ -61,16 +166,11 @@ async def test_clone_without_commit() -> None:
         branch="main",
     )
 
-    with patch("gitingest.cloning.check_repo_exists", return_value=True) as mock_check:
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            mock_process = AsyncMock()
-            mock_process.communicate.return_value = (b"output", b"error")
-            mock_exec.return_value = mock_process
-
-            await clone_repo(query)
+    with patch.object(cloning, "check_repo_exists", return_value=True) as mock_check:
+        await clone_repo(query)
 
-            mock_check.assert_called_once_with(query.url)
-            assert mock_exec.call_count == 1  # Only clone call
+        mock_check.assert_not_called()
+        assert len(run_command_calls) == 1  # Only clone call
 
 
 @pytest.mark.asyncio
@@ -79,7 +179,7 @@ async def test_clone_nonexistent_repository() -> None:
     Test cloning a nonexistent repository URL.
 
     Given an invalid or nonexistent URL:
-    When `clone_repo` is called,
+    When `clone_repo` is called and `git clone` reports that the repository is not found,
     Then a ValueError should be raised with an appropriate error message.
     """
     clone_config = CloneConfig(
@@ -88,46 +188,79 @@ async def test_clone_nonexistent_repository() -> None:
         commit=None,
         branch="main",
     )
-    with patch("gitingest.cloning.check_repo_exists", return_value=False) as mock_check:
+    error = RuntimeError("Command failed: git clone\nError: remote: Repository not found.")
+    with patch.object(cloning, "run_command", side_effect=error):
         with pytest.raises(ValueError, match="Repository not found"):
             await clone_repo(clone_config)
 
-            mock_check.assert_called_once_with(clone_config.url)
+
+@pytest.mark.asyncio
+async def test_clone_nonexistent_repository_with_probe(run_command_calls: RunCommandCalls) -> None:
+    """
+    Test cloning a nonexistent repository URL with the existence probe enabled.
+
+    Given an invalid or nonexistent URL:
+    When `clone_repo` is called with `probe=True`,
+    Then a ValueError should be raised before `git clone` is run.
+    """
+    clone_config = CloneConfig(url="https://github.com/user/nonexistent-repo", local_path="/tmp/repo")
+    with patch.object(cloning, "check_repo_exists", return_value=False) as mock_check:
+        with pytest.raises(ValueError, match="Repository not found"):
+            await clone_repo(clone_config, probe=True)
+
+        mock_check.assert_called_once_with(clone_config.url)
+        assert not run_command_calls
 
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    "mock_stdout, return_code, expected",
+    "status_code, expected",
     [
-        (b"HTTP/1.1 200 OK\n", 0, True),  # Existing repo
-        (b"HTTP/1.1 404 Not Found\n", 0, False),  # Non-existing repo
-        (b"HTTP/1.1 200 OK\n", 1, False),  # Failed request
+        (200, True),  # Existing repo
+        (404, False),  # Non-existing repo
+        (None, False),  # Failed request
+        (302, False),  # Redirect, e.g. to a login page
+        (301, True),  # Permanent redirect, the repo may exist at the new location
     ],
 )
-async def test_check_repo_exists(mock_stdout: bytes, return_code: int, expected: bool) -> None:
+async def test_check_repo_exists(
+    status_code: Optional[int],
+    expected: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
     """
-    Test the `_check_repo_exists` function with different Git HTTP responses.
+    Test the `check_repo_exists` function with different Git HTTP responses.
 
-    Given various stdout lines and return codes:
-    When `_check_repo_exists` is called,
+    Given various status codes, or a failed connection:
+    When `check_repo_exists` is called,
     Then it should correctly indicate whether the repository exists.
     """
     url = "https://github.com/user/repo"
+    _mock_http(monkeypatch, {url: status_code})
+
+    repo_exists = await check_repo_exists(url)
+
+    assert repo_exists is expected
 
-    with patch("asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_exec:
-        mock_process = AsyncMock()
-        # Mock the subprocess output
-        mock_process.communicate.return_value = (mock_stdout, b"")
-        mock_process.returncode = return_code
-        mock_exec.return_value = mock_process
 
-        repo_exists = await check_repo_exists(url)
+@pytest.mark.asyncio
+async def test_check_repo_exists_unexpected_status(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test `check_repo_exists` when the server answers with an unexpected status code.
+
+    Given a URL that responds with "500 Internal Server Error":
+    When `check_repo_exists` is called,
+    Then a RuntimeError should be raised.
+    """
+    url = "https://github.com/user/repo"
+    _mock_http(monkeypatch, {url: 500})
 
-        assert repo_exists is expected
+    with pytest.raises(RuntimeError, match="Unexpected status code"):
+        await check_repo_exists(url)
 
 
 @pytest.mark.asyncio
-async def test_clone_with_custom_branch() -> None:
+async def test_clone_with_custom_branch(run_command_calls: RunCommandCalls) -> None:
     """
     Test cloning a repository with a specified custom branch.
 
@@ -136,20 +269,20 @@ async def test_clone_with_custom_branch() -> None:
     Then the repository should be cloned shallowly to that branch.
     """
     clone_config = CloneConfig(url="https://github.com/user/repo", local_path="/tmp/repo", branch="feature-branch")
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            await clone_repo(clone_config)
-
-            mock_exec.assert_called_once_with(
-                "git",
-                "clone",
-                "--single-branch",
-                "--depth=1",
-                "--branch",
-                "feature-branch",
-                clone_config.url,
-                clone_config.local_path,
-            )
+    await clone_repo(clone_config)
+
+    assert run_command_calls == [
+        (
+            "git",
+            "clone",
+            "--single-branch",
+            "--depth=1",
+            "--branch",
+            "feature-branch",
+            clone_config.url,
+            clone_config.local_path,
+        )
+    ]
 
 
 @pytest.mark.asyncio
@@ -165,14 +298,14 @@ async def test_git_command_failure() -> None:
         url="https://github.com/user/repo",
         local_path="/tmp/repo",
     )
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", side_effect=RuntimeError("Git command failed")):
+    with patch.object(cloning, "check_repo_exists", return_value=True):
+        with patch.object(cloning, "run_command", side_effect=RuntimeError("Git command failed")):
             with pytest.raises(RuntimeError, match="Git command failed"):
                 await clone_repo(clone_config)
 
 
 @pytest.mark.asyncio
-async def test_clone_default_shallow_clone() -> None:
+async def test_clone_default_shallow_clone(run_command_calls: RunCommandCalls) -> None:
     """
     Test cloning a repository with the default shallow clone options.
 
@@ -185,22 +318,22 @@ async def test_clone_default_shallow_clone() -> None:
         local_path="/tmp/repo",
     )
 
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            await clone_repo(clone_config)
+    await clone_repo(clone_config)
 
-            mock_exec.assert_called_once_with(
-                "git",
-                "clone",
-                "--single-branch",
-                "--depth=1",
-                clone_config.url,
-                clone_config.local_path,
-            )
+    assert run_command_calls == [
+        (
+            "git",
+            "clone",
+            "--single-branch",
+            "--depth=1",
+            clone_config.url,
+            clone_config.local_path,
+        )
+    ]
 
 
 @pytest.mark.asyncio
-async def test_clone_commit_without_branch() -> None:
+async def test_clone_commit_without_branch(run_command_calls: RunCommandCalls) -> None:
     """
     Test cloning when a commit hash is provided but no branch is specified.
 
@@ -213,55 +346,129 @@ async def test_clone_commit_without_branch() -> None:
         local_path="/tmp/repo",
         commit="a" * 40,  # Simulating a valid commit hash
     )
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            await clone_repo(clone_config)
+    await clone_repo(clone_config)
 
-            assert mock_exec.call_count == 2  # Clone and checkout calls
-            mock_exec.assert_any_call("git", "clone", "--single-branch", clone_config.url, clone_config.local_path)
-            mock_exec.assert_any_call("git", "-C", clone_config.local_path, "checkout", clone_config.commit)
+    assert run_command_calls == [
+        ("git", "clone", "--single-branch", "--no-checkout", clone_config.url, clone_config.local_path),
+        ("git", "-C", clone_config.local_path, "checkout", clone_config.commit),
+    ]
 
 
 @pytest.mark.asyncio
-async def test_check_repo_exists_with_redirect() -> None:
+@pytest.mark.parametrize("subpath", ["/", "src/docs"])
+async def test_clone_commit_with_clone_revision(
+    subpath: str,
+    run_command_calls: RunCommandCalls,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
     """
-    Test `check_repo_exists` when a redirect (302) is returned.
+    Test cloning a commit with a Git version that supports `git clone --revision`.
 
-    Given a URL that responds with "302 Found":
-    When `check_repo_exists` is called,
-    Then it should return `False`, indicating the repo is inaccessible.
+    Given a valid URL, a commit hash, and Git 2.49:
+    When `clone_repo` is called,
+    Then the commit should be cloned shallowly in one step, and only a sparse checkout should follow, if any.
+    """
+    _use_git_version(monkeypatch, GIT_CLONE_REVISION_VERSION)
+    clone_config = CloneConfig(
+        url="https://github.com/user/repo",
+        local_path="/tmp/repo",
+        commit="a" * 40,  # Simulating a valid commit hash
+        subpath=subpath,
+    )
+    await clone_repo(clone_config)
+
+    if subpath == "/":
+        assert run_command_calls == [
+            (
+                "git",
+                "clone",
+                "--single-branch",
+                f"--revision={clone_config.commit}",
+                "--depth=1",
+                clone_config.url,
+                clone_config.local_path,
+            ),
+        ]
+        return
+
+    assert run_command_calls == [
+        (
+            "git",
+            "clone",
+            "--single-branch",
+            "--filter=blob:none",
+            "--sparse",
+            f"--revision={clone_config.commit}",
+            "--depth=1",
+            clone_config.url,
+            clone_config.local_path,
+        ),
+        ("git", "-C", clone_config.local_path, "sparse-checkout", "set", "src/docs"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_check_repo_exists_is_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that `check_repo_exists` reuses a positive result.
+
+    Given a URL for which the repository exists:
+    When `check_repo_exists` is called twice,
+    Then only the first call should send a request.
     """
     url = "https://github.com/user/repo"
-    with patch("asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_exec:
-        mock_process = AsyncMock()
-        mock_process.communicate.return_value = (b"HTTP/1.1 302 Found\n", b"")
-        mock_process.returncode = 0  # Simulate successful request
-        mock_exec.return_value = mock_process
+    requested_urls = _mock_http(monkeypatch, {url: 200})
 
-        repo_exists = await check_repo_exists(url)
+    assert await check_repo_exists(url)
+    assert await check_repo_exists(url)
 
-        assert repo_exists is False
+    assert requested_urls == [url]
 
 
 @pytest.mark.asyncio
-async def test_check_repo_exists_with_permanent_redirect() -> None:
+async def test_check_repo_exists_missing_is_cached_briefly(monkeypatch: pytest.MonkeyPatch) -> None:
     """
-    Test `check_repo_exists` when a permanent redirect (301) is returned.
+    Test that `check_repo_exists` reuses a negative result only for `REPO_MISSING_TTL` seconds.
 
-    Given a URL that responds with "301 Found":
-    When `check_repo_exists` is called,
-    Then it should return `True`, indicating the repo may exist at the new location.
+    Given a URL for which the repository does not exist:
+    When `check_repo_exists` is called twice, and again once the negative result has expired,
+    Then only the first and the last call should send a request.
     """
     url = "https://github.com/user/repo"
-    with patch("asyncio.create_subprocess_exec", new_callable=AsyncMock) as mock_exec:
-        mock_process = AsyncMock()
-        mock_process.communicate.return_value = (b"HTTP/1.1 301 Found\n", b"")
-        mock_process.returncode = 0  # Simulate successful request
-        mock_exec.return_value = mock_process
+    requested_urls = _mock_http(monkeypatch, {url: 404})
 
-        repo_exists = await check_repo_exists(url)
+    assert not await check_repo_exists(url)
+    assert not await check_repo_exists(url)
+    assert requested_urls == [url]
 
-        assert repo_exists
+    monkeypatch.setattr(git_utils, "REPO_MISSING_TTL", 0.0)
+    assert not await check_repo_exists(url)
+    assert requested_urls == [url, url]
+
+
+@pytest.mark.asyncio
+async def test_check_repos_exist_with_one_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test `check_repos_exist` with several URLs.
+
+    Given URLs answering 404, 200, and failing to connect:
+    When `check_repos_exist` is called,
+    Then a single HTTP client should send all requests, and each URL should get its own result.
+    """
+    urls = ["https://github.com/user/repo", "https://gitlab.com/user/repo", "https://gitea.com/user/repo"]
+    requested_urls = _mock_http(monkeypatch, dict(zip(urls, [404, 200, None])))
+    new_http_client = git_utils._new_http_client  # pylint: disable=protected-access
+    clients: List[httpx.AsyncClient] = []
+
+    def _counting_new_http_client() -> httpx.AsyncClient:
+        clients.append(new_http_client())
+        return clients[-1]
+
+    monkeypatch.setattr(git_utils, "_new_http_client", _counting_new_http_client)
+
+    assert await check_repos_exist(urls) == [False, True, False]
+    assert sorted(requested_urls) == sorted(urls)
+    assert len(clients) == 1
 
 
 @pytest.mark.asyncio
@@ -275,15 +482,13 @@ async def test_clone_with_timeout() -> None:
     """
     clone_config = CloneConfig(url="https://github.com/user/repo", local_path="/tmp/repo")
 
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            mock_exec.side_effect = asyncio.TimeoutError
-            with pytest.raises(AsyncTimeoutError, match="Operation timed out after"):
-                await clone_repo(clone_config)
+    with patch.object(cloning, "run_command", side_effect=asyncio.TimeoutError):
+        with pytest.raises(AsyncTimeoutError, match="Operation timed out after"):
+            await clone_repo(clone_config)
 
 
 @pytest.mark.asyncio
-async def test_clone_specific_branch(tmp_path):
+async def test_clone_specific_branch(tmp_path: Path, local_bare_repo: Path) -> None:
     """
     Test cloning a specific branch of a repository.
 
@@ -291,7 +496,7 @@ async def test_clone_specific_branch(tmp_path):
     When `clone_repo` is called,
     Then the repository should be cloned and checked out at that branch.
     """
-    repo_url = "https://github.com/cyclotruc/gitingest.git"
+    repo_url = local_bare_repo.as_uri()
     branch_name = "main"
     local_path = tmp_path / "gitingest"
 
@@ -303,12 +508,13 @@ async def test_clone_specific_branch(tmp_path):
     assert local_path.is_dir(), "The cloned repository path is not a directory."
 
     # Check the current branch
-    current_branch = os.popen(f"git -C {local_path} branch --show-current").read().strip()
+    stdout, _ = await run_command("git", "-C", str(local_path), "branch", "--show-current")
+    current_branch = stdout.decode().strip()
     assert current_branch == branch_name, f"Expected branch '{branch_name}', got '{current_branch}'."
 
 
 @pytest.mark.asyncio
-async def test_clone_branch_with_slashes(tmp_path):
+async def test_clone_branch_with_slashes(tmp_path: Path, run_command_calls: RunCommandCalls) -> None:
     """
     Test cloning a branch with slashes in the name.
 
@@ -321,24 +527,24 @@ async def test_clone_branch_with_slashes(tmp_path):
     local_path = tmp_path / "gitingest"
 
     clone_config = CloneConfig(url=repo_url, local_path=str(local_path), branch=branch_name)
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            await clone_repo(clone_config)
-
-            mock_exec.assert_called_once_with(
-                "git",
-                "clone",
-                "--single-branch",
-                "--depth=1",
-                "--branch",
-                "fix/in-operator",
-                clone_config.url,
-                clone_config.local_path,
-            )
+    await clone_repo(clone_config)
+
+    assert run_command_calls == [
+        (
+            "git",
+            "clone",
+            "--single-branch",
+            "--depth=1",
+            "--branch",
+            "fix/in-operator",
+            clone_config.url,
+            clone_config.local_path,
+        )
+    ]
 
 
 @pytest.mark.asyncio
-async def test_clone_creates_parent_directory(tmp_path: Path) -> None:
+async def test_clone_creates_parent_directory(tmp_path: Path, run_command_calls: RunCommandCalls) -> None:
     """
     Test that clone_repo creates parent directories if they don't exist.
 
@@ -352,26 +558,26 @@ async def test_clone_creates_parent_directory(tmp_path: Path) -> None:
         local_path=str(nested_path),
     )
 
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            await clone_repo(clone_config)
+    await clone_repo(clone_config)
 
-            # Verify parent directory was created
-            assert nested_path.parent.exists()
+    # Verify parent directory was created
+    assert nested_path.parent.exists()
 
-            # Verify git clone was called with correct parameters
-            mock_exec.assert_called_once_with(
-                "git",
-                "clone",
-                "--single-branch",
-                "--depth=1",
-                clone_config.url,
-                str(nested_path),
-            )
+    # Verify git clone was called with correct parameters
+    assert run_command_calls == [
+        (
+            "git",
+            "clone",
+            "--single-branch",
+            "--depth=1",
+            clone_config.url,
+            str(nested_path),
+        )
+    ]
 
 
 @pytest.mark.asyncio
-async def test_clone_with_specific_subpath() -> None:
+async def test_clone_with_specific_subpath(run_command_calls: RunCommandCalls) -> None:
     """
     Test cloning a repository with a specific subpath.
 
@@ -381,37 +587,34 @@ async def test_clone_with_specific_subpath() -> None:
     """
     clone_config = CloneConfig(url="https://github.com/user/repo", local_path="/tmp/repo", subpath="src/docs")
 
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            await clone_repo(clone_config)
-
-            # Verify the clone command includes sparse checkout flags
-            mock_exec.assert_any_call(
-                "git",
-                "clone",
-                "--single-branch",
-                "--filter=blob:none",
-                "--sparse",
-                "--depth=1",
-                clone_config.url,
-                clone_config.local_path,
-            )
-
-            # Verify the sparse-checkout command sets the correct path
-            mock_exec.assert_any_call("git", "-C", clone_config.local_path, "sparse-checkout", "set", "src/docs")
-
-            assert mock_exec.call_count == 2
+    await clone_repo(clone_config)
+
+    assert run_command_calls == [
+        # The clone command includes sparse checkout flags
+        (
+            "git",
+            "clone",
+            "--single-branch",
+            "--filter=blob:none",
+            "--sparse",
+            "--depth=1",
+            clone_config.url,
+            clone_config.local_path,
+        ),
+        # The sparse-checkout command sets the correct path
+        ("git", "-C", clone_config.local_path, "sparse-checkout", "set", "src/docs"),
+    ]
 
 
 @pytest.mark.asyncio
-async def test_clone_with_commit_and_subpath() -> None:
+async def test_clone_with_commit_and_subpath(run_command_calls: RunCommandCalls) -> None:
     """
     Test cloning a repository with both a specific commit and subpath.
 
     Given a valid repository URL, commit hash, and subpath:
     When `clone_repo` is called,
-    Then the repository should be cloned with sparse checkout enabled,
-    checked out at the specific commit, and only include the specified subpath.
+    Then the repository should be cloned with sparse checkout enabled and without a checkout,
+    restricted to the specified subpath, and checked out at the specific commit.
     """
     clone_config = CloneConfig(
         url="https://github.com/user/repo",
@@ -420,31 +623,183 @@ async def test_clone_with_commit_and_subpath() -> None:
         subpath="src/docs",
     )
 
-    with patch("gitingest.cloning.check_repo_exists", return_value=True):
-        with patch("gitingest.cloning.run_command", new_callable=AsyncMock) as mock_exec:
-            await clone_repo(clone_config)
+    await clone_repo(clone_config)
+
+    assert run_command_calls == [
+        # The clone command includes sparse checkout flags
+        (
+            "git",
+            "clone",
+            "--single-branch",
+            "--filter=blob:none",
+            "--sparse",
+            "--no-checkout",
+            clone_config.url,
+            clone_config.local_path,
+        ),
+        # The sparse-checkout command sets the correct path
+        ("git", "-C", clone_config.local_path, "sparse-checkout", "set", "src/docs"),
+        # The commit is checked out within that path
+        ("git", "-C", clone_config.local_path, "checkout", clone_config.commit),
+    ]
 
-            # Verify the clone command includes sparse checkout flags
-            mock_exec.assert_any_call(
-                "git",
-                "clone",
-                "--single-branch",
-                "--filter=blob:none",
-                "--sparse",
-                clone_config.url,
-                clone_config.local_path,
-            )
 
-            # Verify the sparse-checkout command sets the correct path
-            mock_exec.assert_any_call(
-                "git",
-                "-C",
-                clone_config.local_path,
-                "sparse-checkout",
-                "set",
-                "src/docs",
-                "checkout",
-                clone_config.commit,
-            )
-
-            assert mock_exec.call_count == 2
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "include_patterns, expected_paths",
+    [
+        ({"src/*.py"}, ["src"]),
+        ({"docs/guide/*.md", "src/gitingest/*"}, ["docs/guide", "src/gitingest"]),
+        ({"src/*.py", "*.md"}, []),
+    ],
+)
+async def test_clone_with_include_patterns(
+    include_patterns: Set[str],
+    expected_paths: List[str],
+    run_command_calls: RunCommandCalls,
+) -> None:
+    """
+    Test cloning a repository with include patterns.
+
+    Given include patterns:
+    When `clone_repo` is called,
+    Then a sparse checkout of the pattern directories should be made if every pattern lies under a directory,
+    and a regular shallow clone otherwise.
+    """
+    clone_config = CloneConfig(
+        url="https://github.com/user/repo",
+        local_path="/tmp/repo",
+        include_patterns=include_patterns,
+    )
+
+    await clone_repo(clone_config)
+
+    if not expected_paths:
+        assert run_command_calls == [
+            ("git", "clone", "--single-branch", "--depth=1", clone_config.url, clone_config.local_path)
+        ]
+        return
+
+    assert run_command_calls == [
+        (
+            "git",
+            "clone",
+            "--single-branch",
+            "--filter=blob:none",
+            "--sparse",
+            "--depth=1",
+            clone_config.url,
+            clone_config.local_path,
+        ),
+        ("git", "-C", clone_config.local_path, "sparse-checkout", "set", *expected_paths),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_clone_repos_in_parallel(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test cloning several repositories with `clone_repos`.
+
+    Given five repositories, one of which fails to clone, and at most three parallel clones:
+    When `clone_repos` is called,
+    Then three clones should run at once, and the failure should be returned without interrupting the other clones.
+    """
+    running: List[str] = []
+    max_running = 0
+
+    async def _fake_run_command(*args: str, capture: bool = True) -> Tuple[bytes, bytes]:
+        nonlocal max_running
+        assert not capture
+        url = args[-2]
+        running.append(url)
+        max_running = max(max_running, len(running))
+        await asyncio.sleep(0.01)
+        running.remove(url)
+        if url.endswith("broken"):
+            raise RuntimeError("Command failed: git clone\nError: fatal: early EOF")
+        return b"", b""
+
+    monkeypatch.setattr(cloning, "run_command", _fake_run_command)
+    _use_git_version(monkeypatch, _OLD_GIT_VERSION)
+    names = ["a", "b", "broken", "c", "d"]
+    configs = [CloneConfig(url=f"https://github.com/user/{name}", local_path=f"/tmp/{name}") for name in names]
+
+    results = await clone_repos(configs, max_parallel=3)
+
+    assert max_running == 3
+    assert [type(result) for result in results] == [type(None)] * 2 + [RuntimeError] + [type(None)] * 2
+
+
+@pytest.mark.asyncio
+async def test_clone_from_mirror(tmp_path: Path, local_bare_repo: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test cloning a repository twice with the mirror cache enabled.
+
+    Given a `CLONE_CACHE_PATH` and a repository URL:
+    When `clone_repo` is called twice for the URL,
+    Then the first call should create a bare mirror, the second should only fetch into it,
+    and both should check out the remote `HEAD` from the mirror.
+    """
+    commands: List[str] = []
+
+    async def _recording_run_command(*args: str, capture: bool = True) -> Tuple[bytes, bytes]:
+        commands.append(args[3] if args[1] == "-C" else args[1])
+        return await run_command(*args, capture=capture)
+
+    monkeypatch.setattr(cloning, "CLONE_CACHE_PATH", tmp_path / "cache")
+    monkeypatch.setattr(cloning, "run_command", _recording_run_command)
+    remote_head, _ = await run_command("git", "-C", str(local_bare_repo), "rev-parse", "HEAD")
+
+    for name in ("first", "second"):
+        local_path = tmp_path / name
+        await clone_repo(CloneConfig(url=local_bare_repo.as_uri(), local_path=str(local_path)))
+
+        local_head, _ = await run_command("git", "-C", str(local_path), "rev-parse", "HEAD")
+        assert local_head == remote_head
+
+    assert commands == ["clone", "worktree", "fetch", "worktree", "worktree"]
+
+
+@pytest.mark.asyncio
+async def test_clone_from_mirror_with_main_branch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test cloning the `main` branch from the mirror of a repository whose default branch is `master`.
+
+    Given a repository with both a `main` and a `master` branch, `master` being the default:
+    When `clone_repo` is called with the mirror cache enabled and `branch="main"`,
+    Then the `main` branch should be checked out.
+    """
+    work_path = tmp_path / "work"
+    git_user = ("-c", "user.name=gitingest", "-c", "user.email=gitingest@example.com")
+    for cmd in (
+        ("git", "init", "-q", str(work_path)),
+        ("git", "-C", str(work_path), "symbolic-ref", "HEAD", "refs/heads/master"),
+        ("git", "-C", str(work_path), *git_user, "commit", "-q", "--allow-empty", "-m", "On master"),
+        ("git", "-C", str(work_path), "checkout", "-q", "-b", "main"),
+        ("git", "-C", str(work_path), *git_user, "commit", "-q", "--allow-empty", "-m", "On main"),
+        ("git", "-C", str(work_path), "checkout", "-q", "master"),
+    ):
+        subprocess.run(cmd, check=True)
+
+    monkeypatch.setattr(cloning, "CLONE_CACHE_PATH", tmp_path / "cache")
+    main_head, _ = await run_command("git", "-C", str(work_path), "rev-parse", "main")
+    local_path = tmp_path / "checkout"
+
+    await clone_repo(CloneConfig(url=work_path.as_uri(), local_path=str(local_path), branch="main"))
+
+    local_head, _ = await run_command("git", "-C", str(local_path), "rev-parse", "HEAD")
+    assert local_head == main_head
+
+
+@pytest.mark.asyncio
+async def test_run_command_without_capture() -> None:
+    """
+    Test `run_command` with `capture=False`.
+
+    Given a command writing to its standard output and error:
+    When `run_command` is called with `capture=False`,
+    Then the standard output should be discarded, and the standard error still returned.
+    """
+    code = "import sys; sys.stdout.write('x' * 1_000_000); sys.stderr.write('done')"
+
+    assert await run_command(sys.executable, "-c", code, capture=False) == (b"", b"done")